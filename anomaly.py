@@ -0,0 +1,1495 @@
+"""Anomaly detection pipeline used by the Dashboard Project tab.
+
+Kept free of Streamlit so the same code can be reused outside the app.
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import importlib.util
+import io
+import multiprocessing
+import os
+import pickle
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import IO, Any, BinaryIO, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import IsolationForest
+from sklearn.neighbors import LocalOutlierFactor
+
+MODEL_CHOICES = ["Isolation Forest", "Local Outlier Factor"]
+ENSEMBLE = "Ensemble (IF + LOF + Robust Z)"
+
+DEFAULT_PARAMS: Dict[str, Dict[str, Any]] = {
+    "Isolation Forest": {"contamination": 0.05, "random_state": 42},
+    "Local Outlier Factor": {"n_neighbors": 20, "contamination": 0.05},
+}
+
+
+def sample_transactions(n_rows: int = 200, seed: int = 42) -> pd.DataFrame:
+    """The demo dataset the dashboard scores when nothing is uploaded."""
+    rng = np.random.RandomState(seed)
+    return pd.DataFrame({
+        "transaction_amount": rng.normal(100, 20, n_rows),
+        "transaction_time": rng.randint(0, 24, n_rows),
+        "merchant_id": rng.randint(1, 50, n_rows),
+    })
+
+
+# ----------------------
+# Ingestion
+# ----------------------
+
+def _rewind(source: Any) -> None:
+    if hasattr(source, "seek"):
+        source.seek(0)
+
+
+def downcast_numeric(df: pd.DataFrame) -> pd.DataFrame:
+    """Downcast numeric columns in place to the smallest dtype that holds every value.
+
+    Integers shrink to the narrowest (u)int type that fits their range; floats
+    go to float32, the precision IsolationForest works in internally anyway.
+    """
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_bool_dtype(series):
+            continue
+        if pd.api.types.is_integer_dtype(series):
+            kind = "unsigned" if len(series) and series.min() >= 0 else "integer"
+            df[col] = pd.to_numeric(series, downcast=kind)
+        elif pd.api.types.is_float_dtype(series):
+            df[col] = pd.to_numeric(series, downcast="float")
+    return df
+
+
+def read_csv_chunked(
+    source: str | IO,
+    memory_budget_mb: float = 512,
+    sample_rows: int = 10_000,
+) -> pd.DataFrame:
+    """Read a CSV in chunks while keeping peak memory under ``memory_budget_mb``.
+
+    Column types are inferred once from the first ``sample_rows`` rows; the
+    chunk size is derived from the sample's per-row footprint. Each chunk is
+    downcast before it is kept, and ``pd.concat`` promotes to a common dtype
+    if later chunks need a wider one. Raises MemoryError when the downcast
+    data (plus the concat copy) would not fit in the budget.
+    """
+    budget = int(memory_budget_mb * 1024 ** 2)
+    sample = pd.read_csv(source, nrows=sample_rows)
+    _rewind(source)
+    if sample.empty:
+        return sample
+
+    # floats stay float even if a chunk happens to hold only whole numbers
+    dtype = {c: "float64" for c in sample.columns if pd.api.types.is_float_dtype(sample[c])}
+    row_bytes = max(1, int(sample.memory_usage(index=False, deep=True).sum() / len(sample)))
+    # a quarter of the budget for the raw chunk being parsed, the rest for kept data
+    chunksize = max(1_000, budget // 4 // row_bytes)
+
+    chunks: List[pd.DataFrame] = []
+    kept = 0
+    for chunk in pd.read_csv(source, dtype=dtype, chunksize=chunksize):
+        chunk = downcast_numeric(chunk)
+        kept += int(chunk.memory_usage(index=False, deep=True).sum())
+        if 2 * kept + chunksize * row_bytes > budget:
+            raise MemoryError(
+                f"CSV needs more than the {memory_budget_mb:g} MB ingestion budget; "
+                "raise the budget or use a smaller file."
+            )
+        chunks.append(chunk)
+    _rewind(source)
+    return pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+
+
+def numeric_matrix(df: pd.DataFrame, dtype=np.float32) -> Tuple[np.ndarray, List[str]]:
+    """Copy the numeric columns of ``df`` into one C-contiguous matrix.
+
+    The matrix is allocated once and filled column by column, avoiding the
+    intermediate frame that ``select_dtypes(...).to_numpy()`` would create.
+    """
+    cols = [
+        c for c in df.columns
+        if pd.api.types.is_numeric_dtype(df[c]) and not pd.api.types.is_bool_dtype(df[c])
+    ]
+    out = np.empty((len(df), len(cols)), dtype=dtype)
+    for j, col in enumerate(cols):
+        out[:, j] = df[col].to_numpy(dtype=dtype)
+    return out, cols
+
+
+class FeatureMatrix:
+    """The numeric features of a dataset, built once and shared by every stage.
+
+    Holds one C-contiguous float32 array plus its column names. The content
+    fingerprint is computed on first use and then remembered, so cache
+    lookups for models, SHAP values and views do not rehash the data.
+    NumPy and scikit-learn see the array directly through ``__array__``.
+    """
+
+    def __init__(self, values: np.ndarray, columns: List[str]):
+        self.values = values
+        self.columns = list(columns)
+        self._fingerprint: Optional[str] = None
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "FeatureMatrix":
+        return cls(*numeric_matrix(df))
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        if dtype is None or np.dtype(dtype) == self.values.dtype:
+            return self.values.copy() if copy else self.values
+        return self.values.astype(dtype)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return self.values.shape
+
+    @property
+    def nbytes(self) -> int:
+        return self.values.nbytes
+
+    @property
+    def fingerprint(self) -> str:
+        if self._fingerprint is None:
+            h = hashlib.blake2b(digest_size=16)
+            h.update(repr(self.columns).encode("utf-8"))
+            h.update(dataset_fingerprint(self.values).encode("ascii"))
+            self._fingerprint = h.hexdigest()
+        return self._fingerprint
+
+
+# ----------------------
+# Feature engineering
+# ----------------------
+
+class TransactionFeatures:
+    """Vectorised preprocessing for transaction data, fitted once and reused at scoring time.
+
+    Column roles are detected from names and dtypes: an amount column
+    (name contains "amount"), a time column (name contains "time"), and ID
+    or text columns (names ending in "id", or non-numeric). It produces:
+
+    - robust-scaled numeric columns, ``(x - median) / IQR``;
+    - ``amount_merchant_z``, the amount's z-score within its merchant;
+    - ``hour_sin``/``hour_cos``, a cyclical encoding of the hour of day;
+    - ``<id>_freq``, the share of training rows with that ID value.
+
+    Raw IDs are never fed to the detectors. Every transform is a column-wise
+    NumPy operation or a hash lookup, with no per-row Python.
+    """
+
+    def fit(self, df: pd.DataFrame) -> "TransactionFeatures":
+        lower = {c: str(c).lower() for c in df.columns}
+        self.id_cols_ = [
+            c for c in df.columns
+            if lower[c].endswith("id") or not pd.api.types.is_numeric_dtype(df[c])
+        ]
+        self.amount_col_ = next((c for c in df.columns if "amount" in lower[c] and c not in self.id_cols_), None)
+        self.time_col_ = next((c for c in df.columns if "time" in lower[c] and c not in self.id_cols_), None)
+        self.merchant_col_ = next((c for c in self.id_cols_ if "merchant" in lower[c]), None)
+        self.numeric_cols_ = [
+            c for c in df.columns
+            if c not in self.id_cols_ and c != self.time_col_ and not pd.api.types.is_bool_dtype(df[c])
+        ]
+
+        numeric = df[self.numeric_cols_].to_numpy(dtype=np.float64)
+        q1, self.median_, q3 = np.nanpercentile(numeric, [25, 50, 75], axis=0) if len(numeric) else (0, 0, 0)
+        iqr = np.asarray(q3 - q1, dtype=np.float64)
+        self.iqr_ = np.where(iqr > 0, iqr, 1.0)
+
+        if self.time_col_ is not None:
+            # small values are already hours; larger ones are seconds (as in data/sample_transactions.csv)
+            self.time_in_hours_ = bool(df[self.time_col_].max() <= 24)
+
+        if self.amount_col_ is not None and self.merchant_col_ is not None:
+            grouped = df.groupby(self.merchant_col_, sort=False)[self.amount_col_].agg(["mean", "std"])
+            self.merchants_ = pd.Index(grouped.index)
+            self.merchant_mean_ = grouped["mean"].to_numpy(dtype=np.float64)
+            std = grouped["std"].fillna(0).to_numpy(dtype=np.float64)
+            self.global_mean_ = float(df[self.amount_col_].mean())
+            self.global_std_ = float(df[self.amount_col_].std()) or 1.0
+            self.merchant_std_ = np.where(std > 0, std, self.global_std_)
+
+        self.frequencies_: Dict[Any, Tuple[pd.Index, np.ndarray]] = {}
+        for col in self.id_cols_:
+            counts = df[col].value_counts(normalize=True, sort=False)
+            self.frequencies_[col] = (pd.Index(counts.index), counts.to_numpy(dtype=np.float64))
+
+        self.columns_ = [str(c) for c in self.numeric_cols_]
+        if hasattr(self, "merchants_"):
+            self.columns_.append("amount_merchant_z")
+        if self.time_col_ is not None:
+            self.columns_ += ["hour_sin", "hour_cos"]
+        self.columns_ += [f"{c}_freq" for c in self.id_cols_]
+        return self
+
+    def transform(self, df: pd.DataFrame) -> FeatureMatrix:
+        out = np.empty((len(df), len(self.columns_)), dtype=np.float32)
+        j = len(self.numeric_cols_)
+        out[:, :j] = (df[self.numeric_cols_].to_numpy(dtype=np.float64) - self.median_) / self.iqr_
+
+        if hasattr(self, "merchants_"):
+            pos = self.merchants_.get_indexer(df[self.merchant_col_])
+            known = pos >= 0
+            mean = np.where(known, self.merchant_mean_[pos], self.global_mean_)
+            std = np.where(known, self.merchant_std_[pos], self.global_std_)
+            out[:, j] = (df[self.amount_col_].to_numpy(dtype=np.float64) - mean) / std
+            j += 1
+
+        if self.time_col_ is not None:
+            t = df[self.time_col_].to_numpy(dtype=np.float64)
+            hours = np.mod(t if self.time_in_hours_ else t / 3600.0, 24.0)
+            angle = 2 * np.pi * hours / 24.0
+            out[:, j], out[:, j + 1] = np.sin(angle), np.cos(angle)
+            j += 2
+
+        for col in self.id_cols_:
+            index, freq = self.frequencies_[col]
+            pos = index.get_indexer(df[col])
+            out[:, j] = np.where(pos >= 0, freq[pos], 0.0)
+            j += 1
+        return FeatureMatrix(out, self.columns_)
+
+    def fit_transform(self, df: pd.DataFrame) -> FeatureMatrix:
+        return self.fit(df).transform(df)
+
+
+# ----------------------
+# Fingerprints
+# ----------------------
+
+def dataset_fingerprint(data: pd.DataFrame | np.ndarray | FeatureMatrix) -> str:
+    """Return a content hash of a frame or array (values, dtypes and column names)."""
+    if isinstance(data, FeatureMatrix):
+        return data.fingerprint
+    h = hashlib.blake2b(digest_size=16)
+    if isinstance(data, pd.DataFrame):
+        h.update(repr([(str(c), str(t)) for c, t in data.dtypes.items()]).encode("utf-8"))
+        h.update(pd.util.hash_pandas_object(data, index=False).to_numpy().tobytes())
+    else:
+        arr = np.ascontiguousarray(data)
+        h.update(f"{arr.dtype.str}{arr.shape}".encode("utf-8"))
+        h.update(memoryview(arr).cast("B"))
+    return h.hexdigest()
+
+
+def file_fingerprint(source: str | IO, block_size: int = 1 << 20) -> str:
+    """Return a content hash of a file path or binary file object, read in blocks."""
+    h = hashlib.blake2b(digest_size=16)
+    f = open(source, "rb") if isinstance(source, str) else source
+    try:
+        _rewind(f)
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    finally:
+        if isinstance(source, str):
+            f.close()
+        else:
+            _rewind(f)
+    return h.hexdigest()
+
+
+def model_fingerprint(model) -> str:
+    """Return a content hash of a fitted model (its pickled state)."""
+    return hashlib.blake2b(pickle.dumps(model), digest_size=16).hexdigest()
+
+
+def params_key(params: Dict[str, Any]) -> Tuple[Tuple[str, Any], ...]:
+    """Turn a hyperparameter dict into a hashable, order-independent key."""
+    return tuple(sorted(params.items()))
+
+
+# ----------------------
+# Model store
+# ----------------------
+
+class ModelStore:
+    """Fitted results on local disk, one joblib file per cache key.
+
+    Files are written to a temp name and renamed into place, so concurrent
+    writers never expose a partial file. Loads memory-map the NumPy arrays
+    inside, so several worker processes reading the same model share the
+    OS page cache instead of each holding a private copy.
+
+    ``max_bytes`` and ``max_files`` cap the directory: after each save the
+    least recently used files (by mtime, which loads refresh) are deleted
+    until both limits hold. The file just written is always kept.
+    """
+
+    def __init__(self, root: str | os.PathLike, max_bytes: Optional[int] = None, max_files: Optional[int] = None):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+
+    def path(self, key: Hashable) -> Path:
+        digest = hashlib.blake2b(repr(key).encode("utf-8"), digest_size=16).hexdigest()
+        return self.root / f"{digest}.joblib"
+
+    def load(self, key: Hashable) -> Optional[Any]:
+        """Return the stored value for ``key``, or None if there is none (or it is unreadable)."""
+        path = self.path(key)
+        if not path.exists():
+            return None
+        try:
+            value = joblib.load(path, mmap_mode="r")
+        except Exception:
+            return None
+        try:
+            os.utime(path)  # mark as recently used for pruning
+        except OSError:
+            pass
+        return value
+
+    def save(self, key: Hashable, value: Any) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.path(key)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        joblib.dump(value, tmp)
+        os.replace(tmp, path)
+        self.prune(keep=path)
+
+    def prune(self, keep: Optional[Path] = None) -> None:
+        """Delete least recently used files until the store is within its limits."""
+        if self.max_bytes is None and self.max_files is None:
+            return
+        files = []
+        for f in self.root.glob("*.joblib"):
+            try:
+                st = f.stat()
+            except FileNotFoundError:  # pruned by another process
+                continue
+            files.append((st.st_mtime, st.st_size, f))
+        files.sort(key=lambda t: t[0])
+        total = sum(size for _, size, _ in files)
+        count = len(files)
+        for _, size, f in files:
+            over_bytes = self.max_bytes is not None and total > self.max_bytes
+            over_files = self.max_files is not None and count > self.max_files
+            if not (over_bytes or over_files):
+                break
+            if f == keep:
+                continue
+            try:
+                f.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+            count -= 1
+
+
+# ----------------------
+# Model cache
+# ----------------------
+
+def approx_nbytes(value: Any) -> int:
+    """Rough in-memory size of a cached value, counting array and frame buffers.
+
+    Tuples, lists and dicts are summed, and a ``ResultsView`` is charged its
+    frame and sort orders; scalars and strings are charged
+    ``sys.getsizeof``. Other objects (fitted estimators, sharded forests) are
+    charged the size of their pickle, which tracks their tree arrays.
+    """
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, (np.ndarray, FeatureMatrix)):
+        return int(value.nbytes)
+    if isinstance(value, ResultsView):
+        return approx_nbytes(value.df) + sum(order.nbytes for order in value._orders.values())
+    if isinstance(value, (tuple, list)):
+        return sum(approx_nbytes(v) for v in value)
+    if isinstance(value, dict):
+        return sum(approx_nbytes(v) for v in value.values())
+    if value is None or isinstance(value, (str, bytes, int, float, bool, os.PathLike)):
+        return sys.getsizeof(value)
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+
+class ModelCache:
+    """Small thread-safe LRU cache for fitted models.
+
+    Streamlit serves every session from the same process, so one instance
+    (created through ``st.cache_resource``) is shared by all of them. With a
+    ``store``, misses are looked up on disk before fitting and new fits are
+    written back, so a fresh process does not refit what another one did.
+    ``max_bytes`` additionally bounds the total ``approx_nbytes`` of the
+    entries; a value larger than the whole budget is returned but not kept.
+    ``on_fit(key, seconds)`` is called after every actual fit, and
+    ``on_evict(key, value)`` whenever a value leaves the cache (evicted,
+    replaced, cleared or too big to keep), e.g. to delete a file it owns.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 8,
+        store: Optional[ModelStore] = None,
+        max_bytes: Optional[int] = None,
+        on_fit: Optional[Callable[[Hashable, float], None]] = None,
+        on_evict: Optional[Callable[[Hashable, Any], None]] = None,
+    ):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.store = store
+        self.max_bytes = max_bytes
+        self.on_fit = on_fit
+        self.on_evict = on_evict
+        self.hits = 0
+        self.misses = 0
+        self.nbytes = 0
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._sizes: Dict[Hashable, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            if key not in self._data:
+                return None
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        size = approx_nbytes(value) if self.max_bytes is not None else 0
+        evicted: List[Tuple[Hashable, Any]] = []
+        with self._lock:
+            self._discard(key, evicted)
+            evicted = [(k, v) for k, v in evicted if v is not value]
+            if self.max_bytes is not None and size > self.max_bytes:
+                evicted.append((key, value))
+            else:
+                self._data[key] = value
+                self._sizes[key] = size
+                self.nbytes += size
+                while len(self._data) > self.maxsize or (self.max_bytes is not None and self.nbytes > self.max_bytes):
+                    self._discard(next(iter(self._data)), evicted)
+        self._evicted(evicted)
+
+    def _discard(self, key: Hashable, evicted: List[Tuple[Hashable, Any]]) -> None:
+        if key in self._data:
+            evicted.append((key, self._data.pop(key)))
+            self.nbytes -= self._sizes.pop(key)
+
+    def _evicted(self, evicted: List[Tuple[Hashable, Any]]) -> None:
+        # outside the lock: the hook may do I/O
+        if self.on_evict is not None:
+            for key, value in evicted:
+                self.on_evict(key, value)
+
+    def get_or_fit(self, key: Hashable, fit: Callable[[], Any], persist: bool = True) -> Any:
+        """Return the cached value for ``key``, calling ``fit()`` on a miss.
+
+        The fit runs outside the lock so a slow model never blocks other
+        sessions. ``persist=False`` keeps a value out of the disk store (for
+        results that only make sense in this process, such as temp paths).
+        """
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        self.misses += 1
+        use_store = persist and self.store is not None
+        value = self.store.load(key) if use_store else None
+        if value is None:
+            t0 = time.perf_counter()
+            value = fit()
+            if self.on_fit is not None:
+                self.on_fit(key, time.perf_counter() - t0)
+            if use_store:
+                self.store.save(key, value)
+        self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            evicted = list(self._data.items())
+            self._data.clear()
+            self._sizes.clear()
+            self.nbytes = 0
+        self._evicted(evicted)
+
+
+# ----------------------
+# Detectors
+# ----------------------
+
+def build_model(model_choice: str, params: Dict[str, Any]):
+    """Create an unfitted detector for one of MODEL_CHOICES."""
+    if model_choice == "Isolation Forest":
+        return IsolationForest(**params)
+    if model_choice == "Local Outlier Factor":
+        return LocalOutlierFactor(**params)
+    raise ValueError(f"Unknown model: {model_choice}")
+
+
+def anomaly_scores(model, X: Optional[pd.DataFrame | np.ndarray] = None) -> np.ndarray:
+    """Continuous anomaly scores of a fitted detector; higher means more anomalous.
+
+    Isolation Forest scores ``X``; a (non-novelty) LOF returns the scores of
+    the rows it was fitted on.
+    """
+    if isinstance(model, LocalOutlierFactor) and not model.novelty:
+        return -model.negative_outlier_factor_
+    return -model.score_samples(X)
+
+
+def score_threshold(scores: np.ndarray, contamination: float) -> float:
+    """Score above which the top ``contamination`` share of rows lies."""
+    return float(np.quantile(scores, 1.0 - contamination)) if len(scores) else np.inf
+
+
+def threshold_labels(scores: np.ndarray, contamination: float) -> np.ndarray:
+    """Label the top ``contamination`` share of ``scores`` as anomalies (-1), the rest 1.
+
+    One percentile cut over the stored scores, so changing the sensitivity
+    never needs a refit.
+    """
+    return np.where(scores > score_threshold(scores, contamination), -1, 1)
+
+
+def score_anomalies(
+    X: pd.DataFrame | np.ndarray,
+    model_choice: str,
+    params: Optional[Dict[str, Any]] = None,
+    cache: Optional[ModelCache] = None,
+) -> Tuple[Any, np.ndarray]:
+    """Fit the chosen detector on ``X`` and return ``(model, scores)``.
+
+    When a cache is given, results are keyed by the data fingerprint, model
+    and hyperparameters, so an unchanged dataset is never refitted.
+    """
+    params = dict(DEFAULT_PARAMS[model_choice] if params is None else params)
+
+    def fit():
+        values = np.asarray(X) if isinstance(X, FeatureMatrix) else X
+        model = build_model(model_choice, params).fit(values)
+        return model, anomaly_scores(model, values)
+
+    if cache is None:
+        return fit()
+    return cache.get_or_fit(cache_key(X, model_choice, params), fit)
+
+
+def detect_anomalies(
+    X: pd.DataFrame | np.ndarray,
+    model_choice: str,
+    params: Optional[Dict[str, Any]] = None,
+    cache: Optional[ModelCache] = None,
+) -> Tuple[Any, np.ndarray]:
+    """Fit the chosen detector on ``X`` and return ``(model, preds)``.
+
+    ``preds`` follows scikit-learn's convention (-1 anomaly, 1 normal), cut at
+    the model's ``contamination``.
+    """
+    params = dict(DEFAULT_PARAMS[model_choice] if params is None else params)
+    model, scores = score_anomalies(X, model_choice, params, cache)
+    return model, threshold_labels(scores, params.get("contamination", 0.05))
+
+
+def cache_key(X: pd.DataFrame | np.ndarray, name: str, params: Dict[str, Any]) -> Tuple:
+    """Cache key for a result computed from ``X`` by ``name`` with ``params``."""
+    return (dataset_fingerprint(X), name, params_key(params))
+
+
+# ----------------------
+# Scalable LOF
+# ----------------------
+
+def neighbor_algorithm(n_features: int) -> str:
+    """Pick the neighbour-search structure for ``n_features`` dimensions.
+
+    KD-trees prune well in low dimensions, ball trees hold up a little
+    longer, and past that a brute-force (BLAS) search is fastest.
+    """
+    if n_features <= 15:
+        return "kd_tree"
+    if n_features <= 50:
+        return "ball_tree"
+    return "brute"
+
+
+def fit_scalable_lof(
+    X: pd.DataFrame | np.ndarray,
+    n_neighbors: int = 20,
+    contamination: float = 0.05,
+    subsample: Optional[int] = 50_000,
+    validation_size: int = 5_000,
+    chunksize: int = 100_000,
+    n_jobs: int = -1,
+    seed: int = 42,
+) -> Tuple[LocalOutlierFactor, np.ndarray, Dict[str, Any]]:
+    """Local Outlier Factor that stays usable on millions of rows.
+
+    When ``X`` has more than ``subsample`` rows, LOF is fitted on a random
+    subsample and every other row is scored in chunks as a novelty against
+    it. Neighbour queries use all cores. Returns ``(model, scores, report)``;
+    the report includes the share of labels (at ``contamination``) that
+    differ from exact LOF run on a random validation sample.
+    """
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    n = len(X)
+    algorithm = neighbor_algorithm(X.shape[1])
+    common = dict(n_neighbors=n_neighbors, contamination=contamination, algorithm=algorithm, n_jobs=n_jobs)
+    report: Dict[str, Any] = {"algorithm": algorithm, "rows": n, "fit_rows": n}
+
+    if subsample is None or subsample >= n:
+        model = LocalOutlierFactor(**common).fit(X)
+        report["label_disagreement"] = 0.0
+        return model, anomaly_scores(model), report
+
+    rng = np.random.default_rng(seed)
+    fit_idx = rng.choice(n, size=subsample, replace=False)
+    model = LocalOutlierFactor(novelty=True, **common).fit(X[fit_idx])
+    scores = np.empty(n, dtype=np.float64)
+    for start in range(0, n, chunksize):
+        scores[start:start + chunksize] = anomaly_scores(model, X[start:start + chunksize])
+    # rows in the fit set keep their training scores rather than being re-scored against themselves
+    scores[fit_idx] = -model.negative_outlier_factor_
+    report["fit_rows"] = subsample
+
+    val_idx = rng.choice(n, size=min(validation_size, n), replace=False)
+    exact = LocalOutlierFactor(**common).fit_predict(X[val_idx])
+    approx = threshold_labels(scores, contamination)[val_idx]
+    report["validation_rows"] = len(val_idx)
+    report["label_disagreement"] = float(np.mean(exact != approx))
+    return model, scores, report
+
+
+# ----------------------
+# Out-of-core scoring
+# ----------------------
+
+def iter_numeric_chunks(
+    source: str | IO, chunksize: int = 100_000
+) -> Iterator[Tuple[pd.DataFrame, np.ndarray, List[str]]]:
+    """Yield ``(chunk, matrix, columns)`` for each chunk of a CSV.
+
+    The numeric columns are fixed by the first chunk so every matrix has the
+    same layout; later chunks are cast to float32 column by column.
+    """
+    _rewind(source)
+    cols: Optional[List[str]] = None
+    for chunk in pd.read_csv(source, chunksize=chunksize):
+        if cols is None:
+            _, cols = numeric_matrix(chunk.head(1))
+        X, _ = numeric_matrix(chunk[cols])
+        yield chunk, X, cols
+    _rewind(source)
+
+
+def reservoir_sample(
+    blocks: Iterable[np.ndarray], k: int, seed: int = 42
+) -> np.ndarray:
+    """Uniformly sample ``k`` rows from a stream of row blocks (Algorithm R).
+
+    The per-row replacement draws are made for a whole block at once; when
+    several rows in a block hit the same slot the latest one wins, exactly as
+    in the row-by-row algorithm.
+    """
+    rng = np.random.default_rng(seed)
+    reservoir: Optional[np.ndarray] = None
+    seen = 0
+    for block in blocks:
+        if reservoir is None:
+            reservoir = np.empty((k, block.shape[1]), dtype=block.dtype)
+        n = len(block)
+        fill = min(max(k - seen, 0), n)
+        reservoir[seen:seen + fill] = block[:fill]
+        if fill < n:
+            idx = np.arange(seen + fill, seen + n)
+            slots = rng.integers(0, idx + 1)
+            hit = np.flatnonzero(slots < k)
+            # keep only the last write to each slot
+            _, last = np.unique(slots[hit][::-1], return_index=True)
+            chosen = hit[::-1][last]
+            reservoir[slots[chosen]] = block[fill:][chosen]
+        seen += n
+    if reservoir is None:
+        raise ValueError("cannot sample from an empty stream")
+    return reservoir[:min(seen, k)]
+
+
+def fit_on_sample(
+    source: str | IO,
+    sample_size: int = 100_000,
+    chunksize: int = 100_000,
+    params: Optional[Dict[str, Any]] = None,
+) -> Tuple[IsolationForest, List[str]]:
+    """Fit an IsolationForest on a reservoir sample of a CSV that may not fit in memory."""
+    params = dict(DEFAULT_PARAMS["Isolation Forest"] if params is None else params)
+    cols: List[str] = []
+
+    def blocks():
+        for _, X, chunk_cols in iter_numeric_chunks(source, chunksize):
+            cols[:] = chunk_cols
+            yield X
+
+    sample = reservoir_sample(blocks(), sample_size, seed=params.get("random_state") or 0)
+    model = IsolationForest(**params).fit(sample)
+    return model, cols
+
+
+def score_stream(
+    source: str | IO, model, chunksize: int = 100_000
+) -> Iterator[pd.DataFrame]:
+    """Yield each chunk of ``source`` with an ``Anomaly`` column added."""
+    for chunk, X, _ in iter_numeric_chunks(source, chunksize):
+        preds = model.predict(X)
+        chunk["Anomaly"] = np.where(preds == -1, "Yes", "No")
+        yield chunk
+
+
+def write_csv_stream(chunks: Iterable[pd.DataFrame], out: str | IO) -> Tuple[int, int]:
+    """Write chunks to one CSV as they arrive; returns ``(rows, anomalies)``."""
+    f = open(out, "w", newline="", encoding="utf-8") if isinstance(out, str) else out
+    rows = anomalies = 0
+    try:
+        for i, chunk in enumerate(chunks):
+            chunk.to_csv(f, index=False, header=(i == 0))
+            rows += len(chunk)
+            anomalies += int((chunk["Anomaly"] == "Yes").sum())
+    finally:
+        if isinstance(out, str):
+            f.close()
+    return rows, anomalies
+
+
+# ----------------------
+# Parallel execution
+# ----------------------
+
+_worker_model = None
+_worker_X: Optional[np.ndarray] = None
+_worker_shm: Optional[shared_memory.SharedMemory] = None
+
+
+def _pool_context():
+    """Process start method that is safe from a multi-threaded server."""
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def _init_scoring_worker(model_bytes: bytes, shm_name: str, shape: Tuple[int, ...], dtype: str) -> None:
+    global _worker_model, _worker_X, _worker_shm
+    _worker_model = pickle.loads(model_bytes)
+    # workers share the parent's resource tracker, which unlinks the block once
+    _worker_shm = shared_memory.SharedMemory(name=shm_name)
+    _worker_X = np.ndarray(shape, dtype=np.dtype(dtype), buffer=_worker_shm.buf)
+
+
+def _score_partition(bounds: Tuple[int, int]) -> Tuple[int, np.ndarray]:
+    start, stop = bounds
+    return start, _worker_model.score_samples(_worker_X[start:stop])
+
+
+def row_partitions(n_rows: int, n_parts: int) -> List[Tuple[int, int]]:
+    """Split ``range(n_rows)`` into at most ``n_parts`` contiguous ``(start, stop)`` blocks."""
+    edges = np.linspace(0, n_rows, max(1, min(n_parts, n_rows)) + 1, dtype=np.int64)
+    return [(int(a), int(b)) for a, b in zip(edges[:-1], edges[1:]) if b > a]
+
+
+def parallel_score_samples(model, X: np.ndarray, n_workers: int, partitions_per_worker: int = 2) -> np.ndarray:
+    """Run ``model.score_samples`` over row partitions in a process pool.
+
+    ``X`` is copied once into a shared-memory block that every worker maps
+    read-only, so partitions are sliced in place rather than pickled out to
+    each process. The model itself is pickled once per worker.
+    """
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    out = np.empty(len(X), dtype=np.float64)
+    shm = shared_memory.SharedMemory(create=True, size=max(1, X.nbytes))
+    try:
+        shared = np.ndarray(X.shape, dtype=X.dtype, buffer=shm.buf)
+        shared[:] = X
+        initargs = (pickle.dumps(model), shm.name, X.shape, X.dtype.str)
+        with ProcessPoolExecutor(
+            n_workers, mp_context=_pool_context(), initializer=_init_scoring_worker, initargs=initargs
+        ) as pool:
+            for start, scores in pool.map(_score_partition, row_partitions(len(X), n_workers * partitions_per_worker)):
+                out[start:start + len(scores)] = scores
+        del shared
+    finally:
+        shm.close()
+        shm.unlink()
+    return out
+
+
+def fit_parallel_forest(
+    X: pd.DataFrame | np.ndarray,
+    params: Optional[Dict[str, Any]] = None,
+    n_workers: Optional[int] = None,
+    min_parallel_rows: int = 50_000,
+) -> Tuple[IsolationForest, np.ndarray, Dict[str, Any]]:
+    """Isolation Forest with trees built on ``n_workers`` cores and scoring in a process pool.
+
+    Returns ``(model, scores, report)``. The report holds the fit and score
+    times plus the scoring speedup, estimated against serial scoring of the
+    first partition scaled up to the whole dataset. Inputs smaller than
+    ``min_parallel_rows`` are scored in-process, where a pool would only add
+    start-up cost.
+    """
+    n_workers = n_workers or os.cpu_count() or 1
+    params = dict(DEFAULT_PARAMS["Isolation Forest"] if params is None else params)
+    X = np.ascontiguousarray(X, dtype=np.float32)
+
+    t0 = time.perf_counter()
+    model = IsolationForest(n_jobs=n_workers, **params).fit(X)
+    fit_s = time.perf_counter() - t0
+
+    parts = row_partitions(len(X), n_workers * 2)
+    t0 = time.perf_counter()
+    if n_workers > 1 and len(X) >= min_parallel_rows:
+        scores = parallel_score_samples(model, X, n_workers)
+    else:
+        scores = model.score_samples(X)
+    score_s = time.perf_counter() - t0
+
+    # serial baseline: time one partition in-process and scale by row count
+    start, stop = parts[0]
+    t0 = time.perf_counter()
+    model.score_samples(X[start:stop])
+    serial_est = (time.perf_counter() - t0) * len(X) / max(1, stop - start)
+
+    report = {
+        "workers": n_workers,
+        "fit_seconds": fit_s,
+        "score_seconds": score_s,
+        "score_speedup": serial_est / score_s if score_s > 0 else float("nan"),
+    }
+    return model, -scores, report
+
+
+# ----------------------
+# Sharded models
+# ----------------------
+
+def _fit_shard(task: Tuple[int, np.ndarray, Dict[str, Any]]) -> Tuple[int, IsolationForest]:
+    shard, X, params = task
+    return shard, IsolationForest(**params).fit(X)
+
+
+class ShardedForest:
+    """One Isolation Forest per merchant, with a shared model for small merchants.
+
+    With more than ``max_shards`` distinct keys, merchants are hashed into
+    ``max_shards`` buckets instead. Shards with fewer than ``min_shard_rows``
+    rows are not given their own model; their rows go to the global forest.
+    Shard models are fitted in a process pool, one task per shard.
+    """
+
+    def __init__(
+        self,
+        min_shard_rows: int = 256,
+        max_shards: int = 64,
+        params: Optional[Dict[str, Any]] = None,
+        n_workers: Optional[int] = None,
+    ):
+        self.min_shard_rows = min_shard_rows
+        self.max_shards = max_shards
+        self.params = dict(DEFAULT_PARAMS["Isolation Forest"] if params is None else params)
+        self.n_workers = n_workers or os.cpu_count() or 1
+
+    def _shard_ids(self, keys: np.ndarray) -> np.ndarray:
+        """Shard index for every key; -1 where there is no shard model."""
+        if self.bucketed_:
+            shard = (pd.util.hash_array(np.asarray(keys)) % np.uint64(self.max_shards)).astype(np.int64)
+        else:
+            shard = self.keys_.get_indexer(keys)
+        known = shard >= 0
+        shard[known] = np.where(self.has_model_[shard[known]], shard[known], -1)
+        return shard
+
+    def fit(self, X: np.ndarray, keys: np.ndarray) -> "ShardedForest":
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        uniq = pd.unique(np.asarray(keys))
+        self.bucketed_ = len(uniq) > self.max_shards
+        n_shards = self.max_shards if self.bucketed_ else len(uniq)
+        self.keys_ = None if self.bucketed_ else pd.Index(uniq)
+        self.has_model_ = np.ones(n_shards, dtype=bool)
+        shard = self._shard_ids(keys)
+        counts = np.bincount(shard, minlength=n_shards)
+        self.has_model_ = counts >= self.min_shard_rows
+
+        self.global_model_ = IsolationForest(n_jobs=self.n_workers, **self.params).fit(X)
+        order = np.argsort(shard, kind="stable")
+        bounds = np.concatenate([[0], np.cumsum(counts)])
+        tasks = [(i, X[order[bounds[i]:bounds[i + 1]]], self.params) for i in np.flatnonzero(self.has_model_)]
+        self.models_: Dict[int, IsolationForest] = {}
+        if self.n_workers > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(min(self.n_workers, len(tasks)), mp_context=_pool_context()) as pool:
+                self.models_.update(pool.map(_fit_shard, tasks))
+        else:
+            self.models_.update(map(_fit_shard, tasks))
+        return self
+
+    def score(self, X: np.ndarray, keys: np.ndarray) -> np.ndarray:
+        """Anomaly scores (higher = more anomalous), each row scored by its shard's model."""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        shard = self._shard_ids(keys)
+        scores = np.empty(len(X), dtype=np.float64)
+        order = np.argsort(shard, kind="stable")
+        ids, starts = np.unique(shard[order], return_index=True)
+        for i, start, stop in zip(ids, starts, np.append(starts[1:], len(order))):
+            rows = order[start:stop]
+            model = self.global_model_ if i < 0 else self.models_[int(i)]
+            scores[rows] = -model.score_samples(X[rows])
+        return scores
+
+
+def fit_sharded_forest(
+    X: np.ndarray, keys: np.ndarray, min_shard_rows: int = 256, n_workers: Optional[int] = None
+) -> Tuple[ShardedForest, np.ndarray, Dict[str, Any]]:
+    """Fit a ShardedForest and score ``X``; returns ``(model, scores, report)``."""
+    t0 = time.perf_counter()
+    model = ShardedForest(min_shard_rows=min_shard_rows, n_workers=n_workers).fit(X, keys)
+    fit_s = time.perf_counter() - t0
+    scores = model.score(X, keys)
+    fallback_rows = int((model._shard_ids(keys) < 0).sum())
+    report = {
+        "shards": len(model.models_),
+        "bucketed": model.bucketed_,
+        "fallback_rows": fallback_rows,
+        "workers": model.n_workers,
+        "fit_seconds": fit_s,
+    }
+    return model, scores, report
+
+
+# ----------------------
+# Explainability
+# ----------------------
+
+def shap_background(
+    X: np.ndarray, size: int = 50, method: str = "kmeans", seed: int = 42
+) -> np.ndarray:
+    """Summarise ``X`` into ``size`` background rows for SHAP.
+
+    ``"kmeans"`` returns cluster centres fitted on a random sample of at
+    most 20k rows; ``"random"`` returns random rows.
+    """
+    if len(X) <= size:
+        return np.asarray(X)
+    rng = np.random.default_rng(seed)
+    if method == "random":
+        return np.asarray(X)[rng.choice(len(X), size=size, replace=False)]
+    if method != "kmeans":
+        raise ValueError(f"Unknown background method: {method}")
+    from sklearn.cluster import KMeans
+
+    sample = np.asarray(X)[rng.choice(len(X), size=min(len(X), 20_000), replace=False)]
+    return KMeans(n_clusters=size, n_init=1, random_state=seed).fit(sample).cluster_centers_
+
+
+def explain_forest(
+    model: IsolationForest,
+    X: np.ndarray,
+    max_rows: int = 300,
+    background_size: int = 50,
+    background: str = "kmeans",
+    seed: int = 42,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """SHAP values for at most ``max_rows`` random rows of ``X``.
+
+    Uses shap's tree explainer against a small background summary instead
+    of the generic explainer with the whole dataset as background. Returns
+    ``(shap_values, rows)``; raises ModuleNotFoundError if shap is missing.
+    """
+    import shap
+
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    rng = np.random.default_rng(seed)
+    rows = X if len(X) <= max_rows else X[np.sort(rng.choice(len(X), size=max_rows, replace=False))]
+    explainer = shap.TreeExplainer(
+        model, data=shap_background(X, background_size, background, seed), feature_perturbation="interventional"
+    )
+    return explainer.shap_values(rows, check_additivity=False), rows
+
+
+# ----------------------
+# Results viewer
+# ----------------------
+
+class ResultsView:
+    """Server-side filtering, sorting and paging over a results frame.
+
+    Sort orders and column bounds are computed once per column and kept,
+    so each rerun only builds a boolean mask and slices one page of rows.
+    Labels that change without refitting (the anomaly threshold) are passed
+    to ``query``/``page`` as arrays instead of living in the frame.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self._orders: Dict[Tuple[str, bool], np.ndarray] = {}
+        self._bounds: Dict[str, Tuple[float, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    def sort_order(self, col: str, descending: bool = False) -> np.ndarray:
+        """Row positions of ``df`` sorted by ``col`` (missing values last)."""
+        key = (col, descending)
+        if key not in self._orders:
+            values = pd.Series(self.df[col].to_numpy())
+            self._orders[key] = values.sort_values(
+                ascending=not descending, kind="stable", na_position="last"
+            ).index.to_numpy()
+        return self._orders[key]
+
+    def bounds(self, col: str) -> Tuple[float, float]:
+        """``(min, max)`` of a numeric column."""
+        if col not in self._bounds:
+            values = self.df[col]
+            self._bounds[col] = (float(values.min()), float(values.max()))
+        return self._bounds[col]
+
+    def query(
+        self,
+        anomaly_mask: Optional[np.ndarray] = None,
+        ranges: Optional[Dict[str, Tuple[float, float]]] = None,
+        sort_by: Optional[str] = None,
+        descending: bool = True,
+        top_n: Optional[int] = None,
+    ) -> np.ndarray:
+        """Return the row positions that pass the filters, in display order.
+
+        ``anomaly_mask`` keeps only rows where it is True.
+        """
+        mask = np.ones(len(self.df), dtype=bool) if anomaly_mask is None else anomaly_mask.copy()
+        for col, (lo, hi) in (ranges or {}).items():
+            values = self.df[col].to_numpy()
+            mask &= (values >= lo) & (values <= hi)
+        if sort_by is None:
+            idx = np.flatnonzero(mask)
+        else:
+            order = self.sort_order(sort_by, descending)
+            idx = order[mask[order]]
+        return idx[:top_n] if top_n else idx
+
+    def page(
+        self, idx: np.ndarray, page: int, page_size: int, extra: Optional[Dict[str, np.ndarray]] = None
+    ) -> pd.DataFrame:
+        """Rows for zero-based ``page`` of a ``query`` result, plus any ``extra`` columns."""
+        start = page * page_size
+        rows = idx[start:start + page_size]
+        return self.df.iloc[rows].assign(**{name: values[rows] for name, values in (extra or {}).items()})
+
+
+# ----------------------
+# Export
+# ----------------------
+
+EXPORT_FORMATS: Dict[str, Tuple[str, str]] = {
+    "CSV": (".csv", "text/csv"),
+    "CSV (gzip)": (".csv.gz", "application/gzip"),
+    "Parquet": (".parquet", "application/vnd.apache.parquet"),
+    "Arrow IPC": (".arrow", "application/vnd.apache.arrow.file"),
+}
+
+
+def available_export_formats() -> List[str]:
+    """Export formats usable in this environment (Parquet/Arrow need pyarrow)."""
+    has_arrow = importlib.util.find_spec("pyarrow") is not None
+    return [f for f in EXPORT_FORMATS if has_arrow or f.startswith("CSV")]
+
+
+def iter_csv_bytes(df: pd.DataFrame, chunk_rows: int = 100_000) -> Iterator[bytes]:
+    """Yield ``df`` as UTF-8 CSV, ``chunk_rows`` rows at a time (header first)."""
+    for start in range(0, max(len(df), 1), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows]
+        yield chunk.to_csv(index=False, header=(start == 0)).encode("utf-8")
+
+
+def export_results(df: pd.DataFrame, fmt: str, out: BinaryIO, chunk_rows: int = 100_000) -> None:
+    """Write ``df`` to the binary stream ``out`` in ``fmt``, one chunk at a time."""
+    if fmt == "CSV":
+        for block in iter_csv_bytes(df, chunk_rows):
+            out.write(block)
+    elif fmt == "CSV (gzip)":
+        with gzip.GzipFile(fileobj=out, mode="wb", compresslevel=6) as gz:
+            for block in iter_csv_bytes(df, chunk_rows):
+                gz.write(block)
+    elif fmt in ("Parquet", "Arrow IPC"):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        # inferred from the whole frame: an empty slice turns object columns into Arrow nulls
+        schema = pa.Schema.from_pandas(df, preserve_index=False)
+        writer = pq.ParquetWriter(out, schema) if fmt == "Parquet" else pa.ipc.new_file(out, schema)
+        with writer:
+            for start in range(0, len(df), chunk_rows):
+                table = pa.Table.from_pandas(df.iloc[start:start + chunk_rows], schema=schema, preserve_index=False)
+                writer.write_table(table)
+    else:
+        raise ValueError(f"Unknown export format: {fmt}")
+
+
+def export_file(df: pd.DataFrame, fmt: str, chunk_rows: int = 100_000) -> BinaryIO:
+    """Export ``df`` to an anonymous temp file and return it rewound for reading."""
+    f = tempfile.TemporaryFile()
+    export_results(df, fmt, f, chunk_rows)
+    f.seek(0)
+    return f
+
+
+# ----------------------
+# Online detection
+# ----------------------
+
+class HalfSpaceTrees:
+    """Streaming Half-Space Trees detector (Tan, Ting & Liu, 2011).
+
+    Every tree is a complete binary tree of fixed ``height`` whose splits
+    halve a randomly perturbed workspace, so no data is stored. Node masses
+    are counted over tumbling windows of ``window_size`` rows: the last full
+    window is the reference used for scoring while the current one fills.
+    The anomaly cut is the ``1 - contamination`` quantile of a rolling buffer
+    of recent scores against the current reference; when the reference rolls
+    the buffer restarts from the completed window's scores, so the cut always
+    matches the reference it is compared against.
+    Scoring and updating walk all trees level by level with NumPy, so a
+    batch costs O(rows * n_trees * height) whatever the history size.
+    """
+
+    def __init__(self, n_trees: int = 25, height: int = 8, window_size: int = 250, seed: int = 42):
+        self.n_trees = n_trees
+        self.height = height
+        self.window_size = window_size
+        self.seed = seed
+
+    @property
+    def n_nodes(self) -> int:
+        return 2 ** (self.height + 1) - 1
+
+    def fit(self, X: np.ndarray, contamination: float = 0.05) -> "HalfSpaceTrees":
+        """Build the trees from the range of ``X`` and use it as the first reference window."""
+        X = np.asarray(X, dtype=np.float64)
+        rng = np.random.default_rng(self.seed)
+        T, d, n_internal = self.n_trees, X.shape[1], 2 ** self.height - 1
+        lo, hi = X.min(axis=0), X.max(axis=0)
+        pivot = lo + rng.random((T, d)) * (hi - lo)
+        radius = 2 * np.maximum(pivot - lo, hi - pivot)
+        radius[radius == 0] = 1.0
+
+        node_lo = np.empty((T, self.n_nodes, d))
+        node_hi = np.empty((T, self.n_nodes, d))
+        node_lo[:, 0], node_hi[:, 0] = pivot - radius, pivot + radius
+        self.split_dim_ = rng.integers(0, d, size=(T, n_internal))
+        self.split_value_ = np.empty((T, n_internal))
+        trees = np.arange(T)
+        for node in range(n_internal):
+            q = self.split_dim_[:, node]
+            mid = (node_lo[trees, node, q] + node_hi[trees, node, q]) / 2
+            self.split_value_[:, node] = mid
+            for child in (2 * node + 1, 2 * node + 2):
+                node_lo[:, child], node_hi[:, child] = node_lo[:, node], node_hi[:, node]
+            node_hi[trees, 2 * node + 1, q] = mid
+            node_lo[trees, 2 * node + 2, q] = mid
+
+        # reference mass from all of X, rescaled to one window
+        self.reference_ = self._mass(X) * (self.window_size / max(1, len(X)))
+        self.latest_ = np.zeros_like(self.reference_)
+        self.window_count_ = 0
+        self.window_rows_: List[np.ndarray] = []
+        self.contamination = contamination
+        self._set_recent(self.score(X))
+        return self
+
+    def _set_recent(self, scores: np.ndarray) -> None:
+        self.recent_scores_ = scores[-self.window_size:]
+        self.threshold_ = score_threshold(self.recent_scores_, self.contamination)
+
+    def _paths(self, X: np.ndarray) -> np.ndarray:
+        """Node id visited at every depth: shape ``(height + 1, n_trees, rows)``."""
+        X = np.asarray(X, dtype=np.float64)
+        trees = np.arange(self.n_trees)[:, None]
+        paths = np.zeros((self.height + 1, self.n_trees, len(X)), dtype=np.int64)
+        node = paths[0]
+        for depth in range(self.height):
+            dim = self.split_dim_[trees, node]
+            right = X[np.arange(len(X)), dim] >= self.split_value_[trees, node]
+            node = 2 * node + 1 + right
+            paths[depth + 1] = node
+        return paths
+
+    def _mass(self, X: np.ndarray) -> np.ndarray:
+        flat = (np.arange(self.n_trees)[:, None] * self.n_nodes + self._paths(X)).ravel()
+        counts = np.bincount(flat, minlength=self.n_trees * self.n_nodes)
+        return counts.reshape(self.n_trees, self.n_nodes).astype(np.float64)
+
+    def score(self, X: np.ndarray) -> np.ndarray:
+        """Anomaly scores against the reference window; higher means more anomalous."""
+        paths = self._paths(X)
+        mass = self.reference_[np.arange(self.n_trees)[None, :, None], paths]
+        # stop at the first node whose mass is too small to be reliable, or at a leaf
+        stop = mass < 0.1 * self.window_size
+        stop[-1] = True
+        depth = stop.argmax(axis=0)
+        leaf_mass = np.take_along_axis(mass, depth[None], axis=0)[0]
+        return -(leaf_mass * 2.0 ** depth).sum(axis=0)
+
+    def update(self, X: np.ndarray) -> "HalfSpaceTrees":
+        """Add ``X`` to the current window, rolling the reference whenever a window fills."""
+        X = np.asarray(X, dtype=np.float64)
+        start = 0
+        while start < len(X):
+            take = min(self.window_size - self.window_count_, len(X) - start)
+            self.latest_ += self._mass(X[start:start + take])
+            self.window_rows_.append(X[start:start + take])
+            self.window_count_ += take
+            start += take
+            if self.window_count_ == self.window_size:
+                self.reference_, self.latest_ = self.latest_, np.zeros_like(self.latest_)
+                self._set_recent(self.score(np.concatenate(self.window_rows_)))
+                self.window_rows_ = []
+                self.window_count_ = 0
+        return self
+
+    def score_update(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Score and label a batch, then learn from it; returns ``(scores, is_anomaly)``.
+
+        The batch's scores join the rolling buffer before the cut is taken,
+        so labels are relative to the recent stream, not only the start-up rows.
+        """
+        scores = self.score(X)
+        self._set_recent(np.concatenate([self.recent_scores_, scores]))
+        flags = scores > self.threshold_
+        self.update(X)
+        return scores, flags
+
+
+class FeedTail:
+    """Reads only the complete rows appended to a CSV since the previous call."""
+
+    def __init__(self, path: str | os.PathLike):
+        self.path = str(path)
+        self.offset = 0
+        self.columns: Optional[List[str]] = None
+
+    def read_new(self) -> pd.DataFrame:
+        with open(self.path, "rb") as f:
+            if self.columns is None or os.fstat(f.fileno()).st_size < self.offset:
+                # first read, or the file was truncated/replaced: start over
+                header = f.readline()
+                self.columns = header.decode("utf-8").strip().split(",")
+                self.offset = len(header)
+            f.seek(self.offset)
+            data = f.read()
+        data = data[:data.rfind(b"\n") + 1]  # leave a partially written last line for next time
+        self.offset += len(data)
+        if not data.strip():
+            return pd.DataFrame(columns=self.columns)
+        return pd.read_csv(io.BytesIO(data), header=None, names=self.columns)
+
+
+class OnlineFeed:
+    """Online anomaly scoring for a CSV that keeps growing.
+
+    The detector is fitted once on the rows present at start-up; afterwards
+    ``poll`` reads just the appended rows, scores them and folds them into
+    the model. Safe to share between sessions. ``template`` keeps the
+    start-up rows for ``append_synthetic_rows``.
+    """
+
+    def __init__(self, path: str | os.PathLike, contamination: float = 0.05, **hst_params: Any):
+        self.tail = FeedTail(path)
+        history = self.tail.read_new()
+        X, self.columns = numeric_matrix(history)
+        self.template = history.head(1_000)
+        self.detector = HalfSpaceTrees(**hst_params).fit(X, contamination)
+        self.rows_seen = len(history)
+        self._lock = threading.Lock()
+
+    def poll(self) -> Tuple[pd.DataFrame, float]:
+        """Score rows appended since the last poll; returns ``(rows, seconds)``."""
+        with self._lock:
+            t0 = time.perf_counter()
+            new = self.tail.read_new()
+            if len(new):
+                X, _ = numeric_matrix(new[self.columns])
+                scores, flags = self.detector.score_update(X)
+                new["Anomaly Score"] = scores
+                new["Anomaly"] = np.where(flags, "Yes", "No")
+                self.rows_seen += len(new)
+            return new, time.perf_counter() - t0
+
+
+def append_synthetic_rows(
+    path: str | os.PathLike,
+    n: int = 100,
+    outlier_share: float = 0.05,
+    seed: Optional[int] = None,
+    template: Optional[pd.DataFrame] = None,
+) -> None:
+    """Append ``n`` rows resembling ``template`` to a CSV feed (demo helper).
+
+    Rows are resampled from ``template`` (default: the start of the file)
+    with small jitter; a share of them is scaled up to act as obvious
+    outliers. Pass a fixed template when appending repeatedly, otherwise
+    earlier synthetic outliers get resampled and scaled again.
+    """
+    if template is None:
+        template = pd.read_csv(path, nrows=1_000)
+    rng = np.random.default_rng(seed)
+    rows = template.iloc[rng.integers(0, len(template), n)].reset_index(drop=True)
+    for col in template.select_dtypes(include=[np.number]).columns:
+        values = rows[col].to_numpy(dtype=np.float64)
+        values = values * rng.normal(1.0, 0.05, n)
+        values[rng.random(n) < outlier_share] *= 5
+        rows[col] = values.round(2) if pd.api.types.is_float_dtype(template[col]) else values.round().astype(np.int64)
+    with open(path, "rb+") as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell():
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+    rows.to_csv(path, mode="a", header=False, index=False)
+
+
+# ----------------------
+# Ensemble
+# ----------------------
+
+def robust_zscore_scores(X: pd.DataFrame | np.ndarray) -> np.ndarray:
+    """Largest per-column robust z-score of each row (median/MAD based).
+
+    A cheap statistical detector: one pass for the medians, one for the MADs.
+    """
+    X = np.asarray(X, dtype=np.float32)
+    median = np.median(X, axis=0)
+    mad = 1.4826 * np.median(np.abs(X - median), axis=0)
+    mad[mad == 0] = 1.0
+    return (np.abs(X - median) / mad).max(axis=1)
+
+
+def rank_normalize(scores: np.ndarray) -> np.ndarray:
+    """Map scores to [0, 1] by rank, so detectors with different scales can be averaged."""
+    ranks = np.empty(len(scores), dtype=np.float64)
+    ranks[np.argsort(scores, kind="stable")] = np.arange(len(scores))
+    return ranks / max(1, len(scores) - 1)
+
+
+def ensemble_scores(
+    X: pd.DataFrame | np.ndarray, cache: Optional[ModelCache] = None
+) -> Tuple[Dict[str, np.ndarray], np.ndarray, Dict[str, float]]:
+    """Run Isolation Forest, LOF and robust z-scores concurrently and fuse them.
+
+    The detectors run in a thread pool (the heavy parts of scikit-learn
+    release the GIL), so wall-clock time tracks the slowest model rather
+    than the sum. Returns ``(scores_by_model, fused, seconds)``; ``fused`` is
+    the mean of the rank-normalised scores and ``seconds`` holds each
+    model's time plus the total wall time.
+    """
+    detectors: Dict[str, Callable[[], np.ndarray]] = {
+        "Isolation Forest": lambda: score_anomalies(X, "Isolation Forest", cache=cache)[1],
+        "Local Outlier Factor": lambda: score_anomalies(X, "Local Outlier Factor", cache=cache)[1],
+        "Robust Z-Score": lambda: robust_zscore_scores(X),
+    }
+
+    def timed(fn: Callable[[], np.ndarray]) -> Tuple[np.ndarray, float]:
+        t0 = time.perf_counter()
+        return fn(), time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(len(detectors)) as pool:
+        futures = {name: pool.submit(timed, fn) for name, fn in detectors.items()}
+        results = {name: f.result() for name, f in futures.items()}
+    seconds = {name: secs for name, (_, secs) in results.items()}
+    seconds["wall"] = time.perf_counter() - t0
+
+    scores = {name: np.asarray(values) for name, (values, _) in results.items()}
+    fused = np.mean([rank_normalize(v) for v in scores.values()], axis=0)
+    return scores, fused, seconds
+
+
+def label_agreement(labels: Dict[str, np.ndarray]) -> pd.DataFrame:
+    """Pairwise share of rows on which two detectors give the same label."""
+    names = list(labels)
+    return pd.DataFrame(
+        [[float(np.mean(labels[a] == labels[b])) for b in names] for a in names], index=names, columns=names
+    )
+
+
+# ----------------------
+# Batch scoring
+# ----------------------
+
+RESULT_COLUMNS = ["Anomaly Score", "Anomaly"]
+
+
+def score_frame(
+    df: pd.DataFrame,
+    model_choice: str = "Isolation Forest",
+    params: Optional[Dict[str, Any]] = None,
+    engineered: bool = False,
+) -> pd.DataFrame:
+    """Run the dashboard pipeline on ``df`` and return it with score and label columns.
+
+    Same steps as the Dashboard Project tab: feature matrix (optionally the
+    engineered transaction features), fit and score, then label the top
+    ``contamination`` share as anomalies. Result columns from an earlier run
+    are dropped first so they are never used as features.
+    """
+    params = dict(DEFAULT_PARAMS[model_choice] if params is None else params)
+    df = df.drop(columns=RESULT_COLUMNS, errors="ignore")
+    X = TransactionFeatures().fit_transform(df) if engineered else FeatureMatrix.from_frame(df)
+    _, scores = score_anomalies(X, model_choice, params)
+    preds = threshold_labels(scores, params.get("contamination", 0.05))
+    return df.assign(**{"Anomaly Score": scores, "Anomaly": np.where(preds == -1, "Yes", "No")})
+
+
+def score_csv_file(
+    src: str | os.PathLike,
+    dst: str | os.PathLike,
+    model_choice: str = "Isolation Forest",
+    params: Optional[Dict[str, Any]] = None,
+    engineered: bool = False,
+    memory_budget_mb: float = 512,
+) -> Dict[str, Any]:
+    """Score one CSV into ``dst`` and return ``{file, rows, anomalies, seconds}``.
+
+    The output is written next to ``dst`` and renamed into place, so a reader
+    never sees a half-written file. Refuses to overwrite ``src`` itself.
+    Top-level so a process pool can run it.
+    """
+    if Path(dst).resolve() == Path(src).resolve():
+        raise ValueError(f"output {dst} would overwrite its input")
+    t0 = time.perf_counter()
+    out = score_frame(read_csv_chunked(str(src), memory_budget_mb), model_choice, params, engineered)
+    dst = Path(dst)
+    fd, tmp = tempfile.mkstemp(dir=dst.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            export_results(out, "CSV", f)
+        os.replace(tmp, dst)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return {
+        "file": str(src),
+        "rows": len(out),
+        "anomalies": int((out["Anomaly"] == "Yes").sum()),
+        "seconds": time.perf_counter() - t0,
+    }
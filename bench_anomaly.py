@@ -0,0 +1,160 @@
+"""Benchmark the Dashboard Project anomaly pipeline stage by stage.
+
+Generates synthetic transactions shaped like data/sample_transactions.csv,
+then times parse, feature matrix, fit, score, SHAP and CSV export for each
+requested size and records the peak memory each stage allocated. Memory is
+measured in a second, traced run of each stage so tracemalloc's overhead
+does not leak into the timings.
+
+    python bench_anomaly.py --sizes 1000 100000 10000000 --output bench.json
+    python bench_anomaly.py --baseline bench.json   # non-zero exit on regressions
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import sklearn
+
+from anomaly import DEFAULT_PARAMS, anomaly_scores, build_model, explain_forest, export_results, numeric_matrix
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+
+
+def synthetic_transactions(n_rows: int, extra_cols: int = 0, anomaly_share: float = 0.01, seed: int = 42) -> pd.DataFrame:
+    """Transactions with the columns of data/sample_transactions.csv plus ``extra_cols`` numeric ones."""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "Amount": rng.lognormal(4.8, 0.6, n_rows).round(2),
+        "Time": rng.integers(0, 172_800, n_rows),
+        "other_column1": rng.random(n_rows).round(2),
+        "other_column2": rng.integers(0, 2, n_rows),
+        "other_column3": rng.integers(0, 4, n_rows),
+    })
+    for i in range(extra_cols):
+        df[f"extra_{i + 1}"] = rng.normal(0, 1, n_rows)
+    outliers = rng.random(n_rows) < anomaly_share
+    df.loc[outliers, "Amount"] *= 20
+    return df
+
+
+def measure(fn: Callable[[], Any], memory: bool = True) -> tuple:
+    """Run ``fn`` and return ``(result, seconds, peak_mb)``.
+
+    The timed run is untraced; with ``memory`` the stage runs once more under
+    tracemalloc and ``peak_mb`` is the most it allocated at any point.
+    """
+    t0 = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - t0
+    if not memory:
+        return result, seconds, None
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return result, seconds, peak / 1024 ** 2
+
+
+def run_size(
+    n_rows: int, model_choice: str, extra_cols: int, shap_rows: int, memory: bool = True
+) -> List[Dict[str, Any]]:
+    """Time every pipeline stage on ``n_rows`` synthetic rows."""
+    csv_bytes = synthetic_transactions(n_rows, extra_cols).to_csv(index=False).encode("utf-8")
+    records: List[Dict[str, Any]] = []
+
+    def record(stage: str, fn: Callable[[], Any]) -> Any:
+        result, seconds, peak_mb = measure(fn, memory)
+        records.append({
+            "rows": n_rows,
+            "model": model_choice,
+            "stage": stage,
+            "seconds": round(seconds, 6),
+            "rows_per_sec": round(n_rows / seconds) if seconds > 0 else None,
+            "peak_mb": None if peak_mb is None else round(peak_mb, 3),
+        })
+        return result
+
+    df = record("parse", lambda: pd.read_csv(io.BytesIO(csv_bytes)))
+    X, _ = record("feature_matrix", lambda: numeric_matrix(df))
+    model = record("fit", lambda: build_model(model_choice, DEFAULT_PARAMS[model_choice]).fit(X))
+    scores = record("score", lambda: anomaly_scores(model, X))
+    if model_choice == "Isolation Forest" and shap_rows:
+        try:
+            import shap  # noqa: F401
+            record("shap", lambda: explain_forest(model, X, max_rows=shap_rows))
+        except ModuleNotFoundError:
+            print("shap not installed; skipping SHAP stage", file=sys.stderr)
+    out = df.assign(**{"Anomaly Score": scores})
+    record("csv_export", lambda: export_results(out, "CSV", io.BytesIO()))
+    return records
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: str, tolerance: float) -> List[str]:
+    """Stages that got slower than the baseline by more than ``tolerance`` (a fraction)."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(r["rows"], r["model"], r["stage"]): r for r in json.load(f)["results"]}
+    regressions = []
+    for r in results:
+        old = baseline.get((r["rows"], r["model"], r["stage"]))
+        if old and old["seconds"] > 0 and r["seconds"] > old["seconds"] * (1 + tolerance):
+            regressions.append(
+                f"{r['stage']} @ {r['rows']:,} rows: {old['seconds']:.4f}s -> {r['seconds']:.4f}s"
+            )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="row counts to benchmark")
+    parser.add_argument("--model", default="Isolation Forest", choices=list(DEFAULT_PARAMS))
+    parser.add_argument("--extra-cols", type=int, default=0, help="additional numeric columns")
+    parser.add_argument("--shap-rows", type=int, default=300, help="rows to explain (0 skips SHAP)")
+    parser.add_argument("--no-memory", action="store_true", help="skip the traced memory runs")
+    parser.add_argument("--output", default="bench_results.json", help="where to write the JSON results")
+    parser.add_argument("--baseline", help="earlier results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs. baseline (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    results: List[Dict[str, Any]] = []
+    for n_rows in args.sizes:
+        for r in run_size(n_rows, args.model, args.extra_cols, args.shap_rows, memory=not args.no_memory):
+            peak = "" if r["peak_mb"] is None else f"{r['peak_mb']:>9.1f} MB"
+            print(f"{r['rows']:>10,}  {r['stage']:<15} {r['seconds']:>9.4f}s  {peak}")
+            results.append(r)
+
+    meta = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "scikit-learn": sklearn.__version__,
+        "cpu_count": os.cpu_count(),
+        "platform": platform.platform(),
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"meta": meta, "results": results}, f, indent=2)
+    print(f"Wrote {len(results)} measurements to {args.output}")
+
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
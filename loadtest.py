@@ -0,0 +1,149 @@
+"""Load generator for the /hello and /predict prediction service.
+
+Each client is a thread with its own keep-alive connection that calls the
+given endpoints in turn until the duration is up. Every request is kept as
+one sample row, so throughput, error rate and latency percentiles can be
+summarised per endpoint and the raw samples exported as CSV:
+
+    python loadtest.py --clients 32 --duration 10 --csv load.csv           # against an in-process server
+    python loadtest.py http://127.0.0.1:8000 --endpoints /predict          # against a running one
+
+Exits non-zero when the error rate exceeds ``--max-error-rate``, so it
+doubles as a smoke test.
+"""
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_PAYLOADS: Dict[str, Optional[Dict[str, Any]]] = {
+    "/hello": None,
+    "/predict": {"instances": [{"transaction_amount": 950.0, "transaction_time": 3, "merchant_id": 7}]},
+}
+
+
+def _client(
+    host: str, port: int, endpoints: List[str], payloads: Dict[str, Optional[Dict[str, Any]]],
+    client_id: int, t0: float, deadline: float, timeout: float, out: List[tuple],
+) -> None:
+    bodies = {e: None if payloads.get(e) is None else json.dumps(payloads[e]).encode("utf-8") for e in endpoints}
+    headers = {"Content-Type": "application/json"}
+    conn = http.client.HTTPConnection(host, port, timeout=timeout)
+    i = client_id  # stagger the endpoint order across clients
+    try:
+        while True:
+            start = time.perf_counter()
+            if start >= deadline:
+                break
+            endpoint = endpoints[i % len(endpoints)]
+            i += 1
+            body = bodies[endpoint]
+            try:
+                conn.request("GET" if body is None else "POST", endpoint, body, headers)
+                resp = conn.getresponse()
+                resp.read()
+                status, error = resp.status, "" if resp.status < 400 else resp.reason
+            except (OSError, http.client.HTTPException) as e:
+                status, error = 0, type(e).__name__
+                conn.close()  # reconnect on the next request
+            out.append((client_id, endpoint, start - t0, (time.perf_counter() - start) * 1000, status, error))
+    finally:
+        conn.close()
+
+
+def run_load_test(
+    base_url: str,
+    endpoints: List[str],
+    clients: int = 8,
+    duration: float = 5.0,
+    payloads: Optional[Dict[str, Optional[Dict[str, Any]]]] = None,
+    timeout: float = 5.0,
+) -> pd.DataFrame:
+    """Drive ``endpoints`` with ``clients`` concurrent connections for ``duration`` seconds.
+
+    Returns one row per request: client, endpoint, start_s (since the test
+    began), latency_ms, status (0 for a connection-level failure) and error.
+    """
+    url = urlsplit(base_url)
+    payloads = DEFAULT_PAYLOADS if payloads is None else payloads
+    per_client: List[List[tuple]] = [[] for _ in range(clients)]
+    t0 = time.perf_counter()
+    deadline = t0 + duration
+    threads = [
+        threading.Thread(
+            target=_client,
+            args=(url.hostname, url.port or 80, endpoints, payloads, c, t0, deadline, timeout, per_client[c]),
+            daemon=True,
+        )
+        for c in range(clients)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    rows = [r for samples in per_client for r in samples]
+    return pd.DataFrame(rows, columns=["client", "endpoint", "start_s", "latency_ms", "status", "error"])
+
+
+def summarize(samples: pd.DataFrame, duration: float) -> pd.DataFrame:
+    """Per-endpoint (and overall) request count, throughput, error rate and p50/p95/p99 latency."""
+    def stats(group: pd.DataFrame) -> Dict[str, float]:
+        ok = group.loc[group["error"] == "", "latency_ms"].to_numpy()
+        p50, p95, p99 = np.percentile(ok, [50, 95, 99]) if len(ok) else (np.nan,) * 3
+        return {
+            "requests": len(group),
+            "requests/s": len(group) / duration,
+            "error rate": float((group["error"] != "").mean()) if len(group) else 0.0,
+            "p50 ms": p50,
+            "p95 ms": p95,
+            "p99 ms": p99,
+        }
+
+    table = {endpoint: stats(group) for endpoint, group in samples.groupby("endpoint")}
+    if len(table) > 1:
+        table["all"] = stats(samples)
+    return pd.DataFrame(table).T
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("url", nargs="?", help="service base URL (default: start one in-process)")
+    parser.add_argument("--endpoints", nargs="+", default=list(DEFAULT_PAYLOADS), choices=list(DEFAULT_PAYLOADS))
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    parser.add_argument("--csv", help="write the raw samples here")
+    parser.add_argument("--max-error-rate", type=float, default=0.0, help="exit non-zero above this error rate")
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.url is None:
+        from anomaly import sample_transactions
+        from serving import Predictor, start_server
+
+        server = start_server(Predictor.fit(sample_transactions()), batch_items=64)
+    try:
+        samples = run_load_test(args.url or server.url, args.endpoints, args.clients, args.duration)
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+    print(summarize(samples, args.duration).to_string(float_format=lambda v: f"{v:,.2f}"))
+    if args.csv:
+        samples.to_csv(args.csv, index=False)
+        print(f"Wrote {len(samples):,} samples to {args.csv}")
+    error_rate = (samples["error"] != "").mean() if len(samples) else 1.0
+    return 1 if error_rate > args.max_error_rate else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""Process-wide operational metrics for the app itself.
+
+Each metric is a fixed-size ring buffer of ``(timestamp, value)`` pairs in
+NumPy arrays, so recording is O(1) with no allocation and memory stays
+bounded however long the process runs. Reading copies the buffer out in
+time order.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+class RingBuffer:
+    """The last ``capacity`` timestamped values of one metric."""
+
+    def __init__(self, capacity: int = 2048):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.count = 0  # values ever recorded; the buffer holds the last min(count, capacity)
+        self._t = np.zeros(capacity, dtype=np.float64)
+        self._v = np.zeros(capacity, dtype=np.float64)
+        self._lock = threading.Lock()
+
+    def append(self, value: float, t: Optional[float] = None) -> None:
+        with self._lock:
+            i = self.count % self.capacity
+            self._t[i] = time.time() if t is None else t
+            self._v[i] = value
+            self.count += 1
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def snapshot(self) -> tuple:
+        """``(timestamps, values)`` copies, oldest first."""
+        with self._lock:
+            n, start = len(self), self.count % self.capacity
+            if n < self.capacity:
+                return self._t[:n].copy(), self._v[:n].copy()
+            return np.roll(self._t, -start), np.roll(self._v, -start)
+
+
+class MetricsRegistry:
+    """Named ring buffers, created on first use."""
+
+    def __init__(self, capacity: int = 2048):
+        self.capacity = capacity
+        self._buffers: Dict[str, RingBuffer] = {}
+        self._lock = threading.Lock()
+
+    def buffer(self, name: str) -> RingBuffer:
+        buf = self._buffers.get(name)
+        if buf is None:
+            with self._lock:
+                buf = self._buffers.setdefault(name, RingBuffer(self.capacity))
+        return buf
+
+    def record(self, name: str, value: float) -> None:
+        self.buffer(name).append(value)
+
+    def incr(self, name: str) -> None:
+        self.buffer(name).append(1.0)
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """Record the wall time of the ``with`` body in seconds, even if it raises."""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - t0)
+
+    def sized(self, name: str, produce: Callable[[], Any]) -> Callable[[], Any]:
+        """Wrap ``produce`` so the byte size of what it returns (bytes or a file) is recorded."""
+        def wrapper() -> Any:
+            data = produce()
+            if isinstance(data, (bytes, bytearray, str)):
+                size = len(data)
+            else:
+                size = os.fstat(data.fileno()).st_size
+            self.record(name, size)
+            return data
+        return wrapper
+
+    def names(self, prefix: str = "") -> List[str]:
+        return sorted(n for n in list(self._buffers) if n.startswith(prefix))
+
+    def count(self, name: str) -> int:
+        buf = self._buffers.get(name)
+        return buf.count if buf else 0
+
+    def series(self, name: str) -> pd.DataFrame:
+        """Recorded values of ``name`` as a frame with ``time`` and ``value`` columns."""
+        buf = self._buffers.get(name)
+        t, v = buf.snapshot() if buf else (np.empty(0), np.empty(0))
+        return pd.DataFrame({"time": pd.to_datetime(t, unit="s"), "value": v})
+
+    def frame(self, prefix: str = "") -> pd.DataFrame:
+        """All metrics under ``prefix`` in long form: ``metric``, ``time``, ``value``."""
+        parts = [self.series(n).assign(metric=n[len(prefix):]) for n in self.names(prefix)]
+        if not parts:
+            return pd.DataFrame({"metric": [], "time": pd.to_datetime([]), "value": []})
+        return pd.concat(parts, ignore_index=True)[["metric", "time", "value"]]
@@ -0,0 +1,291 @@
+"""Background CI/CD pipeline runs for the DevOps tab.
+
+The pipeline is a DAG of shell steps. A run is a ``PipelineJob`` executed
+on a small shared pool, so the Streamlit script that started it returns
+immediately and only polls the job's state. Within a run, every step whose
+dependencies have finished is started at once on a shared step pool, so
+independent stages (lint and unit tests) overlap.
+
+Each step is keyed by a hash of its command, the contents of its input
+files and its dependencies' keys. A step whose key has already succeeded
+and whose declared output files still exist is skipped and its earlier
+result reused, so a rerun with no code changes does no work, a change only
+reruns the steps downstream of it, and a deleted ``build/`` is rebuilt.
+"""
+from __future__ import annotations
+
+import glob
+import hashlib
+import os
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# step states
+PENDING, RUNNING, OK, WARNING, FAILED, CACHED, SKIPPED = (
+    "pending", "running", "ok", "warning", "failed", "cached", "skipped"
+)
+
+ROOT = Path(__file__).parent
+SOURCES = ("*.py", "requirements.txt")
+
+
+class Step:
+    """One shell command in the pipeline, run from the repo root.
+
+    ``inputs`` and ``outputs`` are glob patterns relative to the root; every
+    output pattern must match a file for a cached result to be reused.
+    """
+
+    def __init__(
+        self, name: str, command: str, deps: Sequence[str] = (), inputs: Sequence[str] = SOURCES,
+        outputs: Sequence[str] = (),
+    ):
+        self.name = name
+        self.command = command
+        self.deps = list(deps)
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+
+
+class StepResult:
+    def __init__(self, status: str, seconds: float, output: str = "", started: float = 0.0):
+        self.status = status
+        self.seconds = seconds
+        self.output = output
+        self.started = started  # wall-clock start, for timelines
+
+
+PY = f'"{sys.executable}"'
+PIPELINE_STEPS = [
+    Step("Code Commit", "git log -1 --format='%h %s'"),
+    Step("Lint Code", f"{PY} -m compileall -q .", ["Code Commit"]),
+    Step(
+        "Run Unit Tests",
+        f"{PY} -c \"from anomaly import detect_anomalies, sample_transactions; "
+        f"_, p = detect_anomalies(sample_transactions(), 'Isolation Forest'); assert (p == -1).sum() == 10\"",
+        ["Code Commit"],
+    ),
+    Step("Build Docker Image", "mkdir -p build && tar czf build/app.tar.gz *.py requirements.txt",
+         ["Lint Code", "Run Unit Tests"], outputs=["build/app.tar.gz"]),
+    Step("Push Docker Image", "mkdir -p build/registry && cp build/app.tar.gz build/registry/",
+         ["Build Docker Image"], outputs=["build/registry/app.tar.gz"]),
+    Step("Deploy to Staging", "rm -rf build/staging && mkdir -p build/staging && "
+         "tar xzf build/registry/app.tar.gz -C build/staging", ["Push Docker Image"],
+         outputs=["build/staging/*.py"]),
+    Step("Smoke Tests", f"cd build/staging && {PY} loadtest.py --clients 2 --duration 1", ["Deploy to Staging"]),
+    Step("Deploy to Production", "rm -rf build/production && cp -r build/staging build/production",
+         ["Smoke Tests"], outputs=["build/production/*.py"]),
+]
+
+
+def topological_order(steps: Sequence[Step]) -> List[Step]:
+    """``steps`` ordered so every step comes after its dependencies; raises on cycles or unknown deps."""
+    by_name = {s.name: s for s in steps}
+    order: List[Step] = []
+    state: Dict[str, int] = {}  # 1 = visiting, 2 = done
+
+    def visit(step: Step) -> None:
+        if state.get(step.name) == 2:
+            return
+        if state.get(step.name) == 1:
+            raise ValueError(f"dependency cycle through {step.name!r}")
+        state[step.name] = 1
+        for dep in step.deps:
+            if dep not in by_name:
+                raise ValueError(f"{step.name!r} depends on unknown step {dep!r}")
+            visit(by_name[dep])
+        state[step.name] = 2
+        order.append(step)
+
+    for step in steps:
+        visit(step)
+    return order
+
+
+def step_key(step: Step, dep_keys: Sequence[str], root: Path = ROOT) -> str:
+    """Hash of the step's command, input file contents and its dependencies' keys."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(step.command.encode("utf-8"))
+    for key in dep_keys:
+        h.update(key.encode("ascii"))
+    files = sorted({f for pattern in step.inputs for f in glob.glob(str(root / pattern))})
+    for f in files:
+        h.update(os.path.relpath(f, root).encode("utf-8"))
+        with open(f, "rb") as fh:
+            h.update(hashlib.blake2b(fh.read(), digest_size=16).digest())
+    return h.hexdigest()
+
+
+def outputs_exist(step: Step, root: Path = ROOT) -> bool:
+    """Whether every output pattern of ``step`` matches at least one file."""
+    return all(glob.glob(str(root / pattern)) for pattern in step.outputs)
+
+
+def run_shell(step: Step, root: Path = ROOT, timeout: float = 300) -> StepResult:
+    """Run the step's command; exit 0 with stderr output counts as a warning."""
+    started, t0 = time.time(), time.perf_counter()
+    try:
+        proc = subprocess.run(step.command, shell=True, cwd=root, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return StepResult(FAILED, time.perf_counter() - t0, f"timed out after {timeout:.0f}s", started)
+    if proc.returncode:
+        status = FAILED
+    else:
+        status = WARNING if proc.stderr.strip() else OK
+    return StepResult(status, time.perf_counter() - t0, (proc.stdout + proc.stderr).strip(), started)
+
+
+def critical_path(steps: Sequence[Step], seconds: Dict[str, float]) -> Tuple[List[str], float]:
+    """Longest chain of dependent steps by ``seconds``, and its total duration."""
+    finish: Dict[str, float] = {}
+    via: Dict[str, Optional[str]] = {}
+    for step in topological_order(steps):
+        prev = max(step.deps, key=lambda d: finish[d], default=None)
+        via[step.name] = prev
+        finish[step.name] = (finish[prev] if prev else 0.0) + seconds.get(step.name, 0.0)
+    if not finish:
+        return [], 0.0
+    name: Optional[str] = max(finish, key=finish.get)
+    total = finish[name]
+    path = []
+    while name is not None:
+        path.append(name)
+        name = via[name]
+    return path[::-1], total
+
+
+class PipelineJob:
+    """State of one pipeline run, written by the runner and read by any session."""
+
+    def __init__(self, steps: Sequence[Step]):
+        self.id = uuid.uuid4().hex[:8]
+        self.steps = topological_order(steps)
+        self.status: Dict[str, str] = {s.name: PENDING for s in self.steps}
+        self.results: Dict[str, StepResult] = {}
+        self.error: Optional[str] = None
+        self.submitted = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+
+    @property
+    def done(self) -> bool:
+        return self.finished is not None
+
+    @property
+    def progress(self) -> float:
+        return sum(s not in (PENDING, RUNNING) for s in self.status.values()) / len(self.steps)
+
+    @property
+    def state(self) -> str:
+        if self.started is None:
+            return "queued"
+        if not self.done:
+            return "running"
+        return FAILED if self.error else OK
+
+    @property
+    def wall_seconds(self) -> float:
+        return (self.finished or time.time()) - (self.started or time.time())
+
+    def seconds(self) -> Dict[str, float]:
+        """Time each step took in this run (0 for cached or skipped steps)."""
+        return {
+            name: (0.0 if self.status[name] == CACHED else r.seconds)
+            for name, r in self.results.items() if self.status[name] != SKIPPED
+        }
+
+    def cache_saved(self) -> float:
+        """Seconds the cached steps took when they last actually ran."""
+        return sum(r.seconds for name, r in self.results.items() if self.status[name] == CACHED)
+
+    def critical_path(self) -> Tuple[List[str], float]:
+        return critical_path(self.steps, self.seconds())
+
+
+class JobRunner:
+    """Shared pools and step cache that pipeline jobs from all sessions use.
+
+    ``max_jobs`` runs coordinate at once and up to ``max_queued`` more wait
+    as "queued"; further submits are rejected. Their steps share
+    ``step_workers`` threads, each of which waits on one subprocess. The default pipeline writes to one shared ``build/``
+    directory, so it should run with ``max_jobs=1``.
+    """
+
+    def __init__(
+        self, max_jobs: int = 1, step_workers: int = 4, max_queued: int = 2, keep: int = 50, root: Path = ROOT
+    ):
+        self.root = root
+        self.max_pending = max_jobs + max_queued
+        self._jobs_pool = ThreadPoolExecutor(max_workers=max_jobs, thread_name_prefix="pipeline")
+        self._step_pool = ThreadPoolExecutor(max_workers=step_workers, thread_name_prefix="pipeline-step")
+        self._jobs: Dict[str, PipelineJob] = {}
+        self._cache: Dict[str, StepResult] = {}  # step key -> last successful result
+        self._keep = keep
+        self._lock = threading.Lock()
+
+    def submit(self, steps: Sequence[Step] = PIPELINE_STEPS, use_cache: bool = True) -> PipelineJob:
+        """Queue a run; raises RuntimeError if ``max_jobs + max_queued`` runs are already unfinished."""
+        job = PipelineJob(steps)
+        with self._lock:
+            if self.active() >= self.max_pending:
+                raise RuntimeError(f"{self.active()} pipeline runs are already queued or running; try again later")
+            self._jobs[job.id] = job
+            while len(self._jobs) > self._keep:  # forget the oldest finished runs
+                oldest = next((j for j in self._jobs.values() if j.done), None)
+                if oldest is None:
+                    break
+                del self._jobs[oldest.id]
+        self._jobs_pool.submit(self._run, job, use_cache)
+        return job
+
+    def get(self, job_id: str) -> Optional[PipelineJob]:
+        return self._jobs.get(job_id)
+
+    def active(self) -> int:
+        return sum(not j.done for j in list(self._jobs.values()))
+
+    def _run(self, job: PipelineJob, use_cache: bool) -> None:
+        job.started = time.time()
+        keys: Dict[str, str] = {}
+        running: Dict[Future, Tuple[Step, str]] = {}
+        remaining = list(job.steps)
+        try:
+            while remaining or running:
+                for step in [s for s in remaining if all(job.status[d] in (OK, WARNING, CACHED) for d in s.deps)]:
+                    remaining.remove(step)
+                    key = keys[step.name] = step_key(step, [keys[d] for d in step.deps], self.root)
+                    cached = self._cache.get(key) if use_cache else None
+                    if cached is not None and outputs_exist(step, self.root):
+                        job.results[step.name] = cached
+                        job.status[step.name] = CACHED
+                        continue
+                    job.status[step.name] = RUNNING
+                    running[self._step_pool.submit(run_shell, step, self.root)] = (step, key)
+                # steps whose dependencies failed can never start
+                for step in [s for s in remaining if any(job.status[d] in (FAILED, SKIPPED) for d in s.deps)]:
+                    remaining.remove(step)
+                    job.status[step.name] = SKIPPED
+                if not running:
+                    continue
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    step, key = running.pop(future)
+                    result = future.result()
+                    job.results[step.name] = result
+                    job.status[step.name] = result.status
+                    if result.status == FAILED:
+                        last_line = (result.output.splitlines() or ["failed"])[-1]
+                        job.error = job.error or f"{step.name}: {last_line}"
+                    else:
+                        with self._lock:
+                            self._cache[key] = result
+        except Exception as e:  # a bad DAG or unreadable input must still finish the job
+            job.error = str(e)
+        finally:
+            job.finished = time.time()
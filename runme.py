@@ -4,11 +4,16 @@ import base64
 import csv
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import TYPE_CHECKING, List, Dict, Optional
 
 import streamlit as st
 from PIL import Image
 
+from metrics import MetricsRegistry
+
+if TYPE_CHECKING:
+    from anomaly import ModelCache
+
 # ======================
 # CONFIG & LIGHT STYLING
 # ======================
@@ -201,11 +206,53 @@ def skill_bar(label: str, pct: int):
     )
 
 # ----------------------
-# Tabs
+# Navigation
 # ----------------------
-tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8, tab9, tab10 = st.tabs(
-    ["Home", "Resume", "Projects", "Skills", "Contact", "Interests and Hobbies", "Organizations", "Dashboard Project", "DevOps Flask Project", "Nasa Project"]
+# Only the selected section runs on a rerun, so browsing Home never fits a
+# model or builds the NASA charts. Each section is a render_* function below.
+SECTION_NAMES = ["Home", "Resume", "Projects", "Skills", "Contact", "Interests and Hobbies", "Organizations", "Dashboard Project", "DevOps Flask Project", "Nasa Project"]
+st.session_state.setdefault("section", "Home")
+
+def keep_section():
+    """Clicking the selected section again clears it; reselect the previous one instead."""
+    if st.session_state["section"] is None:
+        st.session_state["section"] = st.session_state.get("last_section", "Home")
+
+section = st.segmented_control(
+    "Section", SECTION_NAMES, key="section", on_change=keep_section, label_visibility="collapsed"
 )
+st.session_state["last_section"] = section
+
+def go_to(name: str):
+    """Button callback that switches the visible section."""
+    st.session_state["section"] = name
+
+@st.cache_resource
+def app_metrics() -> MetricsRegistry:
+    """Process-wide registry of the app's own reruns, render times, fits and downloads."""
+    return MetricsRegistry()
+
+telemetry = app_metrics()
+telemetry.incr("app.reruns")
+
+MODEL_CACHE_MB = 512  # memory budget for fitted models, scores and SHAP values
+MODEL_STORE_MB = 256  # disk budget for ./models; least recently used files are pruned
+
+@st.cache_resource
+def model_cache() -> ModelCache:
+    """Process-wide LRU of fitted detectors, backed by the on-disk model store.
+
+    Shared by the Dashboard Project and the DevOps prediction service.
+    """
+    from anomaly import ModelCache, ModelStore  # only imported once a section needs a model
+
+    registry = app_metrics()  # on_fit runs on worker threads, which have no script run context
+    return ModelCache(
+        maxsize=8,
+        store=ModelStore(Path(__file__).parent / "models", max_bytes=MODEL_STORE_MB * 1024 ** 2, max_files=200),
+        max_bytes=MODEL_CACHE_MB * 1024 ** 2,
+        on_fit=lambda key, seconds: registry.record("model.fit_seconds", seconds),
+    )
 # === GLOBAL CONFIG ===
 LINKEDIN = "https://www.linkedin.com/in/abhisekhbajracharya"
 GITHUB = "https://github.com/abhisekhbajracharya"
@@ -226,7 +273,7 @@ except Exception:
 
 
 # === TAB 1: ABOUT ME ===
-with tab1:
+def render_home():
     # header images (safe)
     try:
         combined = combine_images([(asset("UTA.jpg"), 300), (asset("pho1.jpg"), 300), (asset("JPM.jpg"), 300)])
@@ -331,7 +378,7 @@ with tab1:
 
 
 # === TAB 2: RESUME ===
-with tab2:
+def render_resume():
 
     st.subheader("🏛️ Download here!")
 
@@ -342,7 +389,7 @@ with tab2:
     if pdf_bytes:
         st.download_button(
             label="⬇️ Download Full Resume (PDF)",
-            data=pdf_bytes,
+            data=telemetry.sized("download.Resume.pdf", lambda: pdf_bytes),
             file_name="Resume.pdf",
             mime="application/pdf",
         )
@@ -444,7 +491,7 @@ with tab2:
 
     
 # === TAB 3: FEATURED PROJECTS ===
-with tab3:
+def render_projects():
     st.header("Featured Projects (Top 3)")
 
     projects: List[Dict] = [
@@ -460,7 +507,6 @@ with tab3:
             "repo": GITHUB,
             "demo": None,
             "stack": ["Python", "Streamlit", "scikit-learn", "pandas"],
-            "tab_var": tab8,  # actual tab variable for Dashboard
             "tab_name": "Dashboard Project"
         },
         {
@@ -475,7 +521,6 @@ with tab3:
             "repo": GITHUB,
             "demo": None,
             "stack": ["GitHub Actions", "Docker", "Flask"],
-            "tab_var": tab9,  # actual tab variable for DevOps Flask
             "tab_name": "DevOps Flask Project"
         },
         {
@@ -490,7 +535,6 @@ with tab3:
             "repo": None,
             "demo": None,
             "stack": ["SQL", "BigQuery", "dbt", "Excel"],
-            "tab_var": tab10,  # fixed to point to Nasa Project tab
             "tab_name": "Nasa Project"
         },
     ]
@@ -504,11 +548,10 @@ with tab3:
                     if img_path.exists():
                         st.image(str(img_path), use_container_width=True, caption=p["title"])
                     else:
-                        st.markdown(f"⚡ **See this project in the '{p['tab_name']}' tab above!**")
-                        st.markdown(f"➡️ Go to {p['tab_name']} Tab")
+                        st.markdown(f"⚡ **See this project in the '{p['tab_name']}' section!**")
                 else:
-                    st.markdown(f"⚡ **See this project in the '{p['tab_name']}' tab above!**")
-                    st.markdown(f"➡️ Go to {p['tab_name']} Tab")
+                    st.markdown(f"⚡ **See this project in the '{p['tab_name']}' section!**")
+                st.button(f"➡️ Go to {p['tab_name']}", key=f"go_{p['tab_name']}", on_click=go_to, args=(p["tab_name"],))
             with c2:
                 st.markdown(f"#### {p['title']}")
                 st.caption(p["when"])
@@ -519,7 +562,7 @@ with tab3:
                     pill(s)
 
 # === TAB 4: SKILLS ===
-with tab4:
+def render_skills():
     st.header("Tech Stack")
     left, right = st.columns(2)
     with left:
@@ -617,7 +660,7 @@ with tab4:
 
 
 # === TAB 5: CONTACT ===
-with tab5:
+def render_contact():
     st.header("📬 Contact")
 
     st.markdown("""
@@ -648,7 +691,7 @@ with tab5:
 
 
 # === TAB 6: Interests and Hobbies ===
-with tab6:
+def render_interests():
     st.header("🌟 Interests and Hobbies")
     st.markdown("### 🤝 Open Source & Community")
     st.write("- Contributed to **Awesome-Data-Science** repo (docs & examples)")
@@ -703,7 +746,7 @@ with tab6:
 
 
 # === TAB 7: ORGANIZATIONS ===
-with tab7:
+def render_organizations():
     st.header("🏛️ Organizations & Communities")
     st.markdown(
         '<div class="card">🚀 <b>NASA L’SPACE Mission Concept Academy</b><br>'
@@ -737,62 +780,340 @@ with tab7:
     )
 
 # === TAB 8: DASHBOARD PROJECT ===
-with tab8:
+def render_dashboard():
     st.header("📊 AI-Powered Business Risk Intelligence Dashboard (2025)")
     st.write("Upload a dataset or use the sample to run anomaly detection.")
 
     import pandas as pd
     import numpy as np
-    from sklearn.ensemble import IsolationForest
-    from sklearn.neighbors import LocalOutlierFactor
+    import os
+    import tempfile
+    import altair as alt
+    from anomaly import (
+        ENSEMBLE, EXPORT_FORMATS, FeatureMatrix, MODEL_CHOICES, ModelCache, OnlineFeed,
+        ResultsView, TransactionFeatures, append_synthetic_rows, available_export_formats,
+        cache_key, dataset_fingerprint, ensemble_scores, explain_forest, export_file,
+        file_fingerprint, fit_on_sample, fit_parallel_forest, fit_scalable_lof, fit_sharded_forest,
+        label_agreement, model_fingerprint, read_csv_chunked, sample_transactions, score_anomalies,
+        score_stream, score_threshold, threshold_labels, write_csv_stream,
+    )
+
+    UPLOAD_CACHE_MB = 1024  # memory budget for parsed uploads shared across sessions
+
+    def remove_results_file(key, value):
+        """Delete the scored CSV of a streaming result once it leaves the cache."""
+        try:
+            os.unlink(value[0])
+        except FileNotFoundError:
+            pass
+
+    @st.cache_resource
+    def stream_cache() -> ModelCache:
+        """Streaming results (temp CSV path, rows, anomalies); each file is deleted on eviction."""
+        return ModelCache(maxsize=4, on_evict=remove_results_file)
+
+    def upload_hash(upload) -> str:
+        """Content hash of an upload, computed once per file_id and session."""
+        upload_hashes = st.session_state.setdefault("upload_hashes", {})
+        if upload.file_id not in upload_hashes:
+            upload_hashes[upload.file_id] = file_fingerprint(upload)
+        return upload_hashes[upload.file_id]
+
+    @st.cache_resource
+    def frame_cache() -> ModelCache:
+        """Parsed uploads keyed by content hash, shared by all sessions and bounded in bytes."""
+        return ModelCache(maxsize=16, max_bytes=UPLOAD_CACHE_MB * 1024 ** 2)
+
+    @st.cache_resource
+    def feature_cache() -> ModelCache:
+        """Process-wide LRU of feature matrices for recent datasets, bounded in bytes."""
+        return ModelCache(maxsize=16, max_bytes=UPLOAD_CACHE_MB * 1024 ** 2 // 2)
+
+    @st.cache_resource
+    def results_cache() -> ModelCache:
+        """Process-wide LRU of results views (scored frames and their sort indexes), bounded in bytes."""
+        return ModelCache(maxsize=4, max_bytes=UPLOAD_CACHE_MB * 1024 ** 2 // 2)
 
     uploaded_file = st.file_uploader("Upload CSV", type="csv")
-    if uploaded_file:
-        df = pd.read_csv(uploaded_file)
+    with st.expander("⚙️ Large file options"):
+        ingest_mode = st.radio(
+            "Ingestion mode",
+            ["In memory", "Chunked (memory-bounded)", "Out-of-core streaming"],
+            help="Chunked reads the upload in pieces and downcasts numeric columns. "
+                 "Streaming fits Isolation Forest on a sample and scores the file chunk by chunk.",
+        )
+        budget_mb = st.number_input("Memory budget (MB)", min_value=64, max_value=65536, value=512, step=64)
+        sample_size = st.number_input("Streaming sample size (rows)", min_value=1_000, max_value=1_000_000, value=100_000, step=10_000)
+
+    if uploaded_file and ingest_mode == "Out-of-core streaming":
+        st.subheader("Dataset Preview")
+        st.dataframe(pd.read_csv(uploaded_file, nrows=5))
+        uploaded_file.seek(0)
+        st.caption("Streaming mode uses Isolation Forest fitted on a reservoir sample of the file.")
+
+        def score_upload() -> tuple:
+            model, _ = fit_on_sample(uploaded_file, sample_size=int(sample_size))
+            out = tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False, newline="", encoding="utf-8")
+            try:
+                with out:
+                    rows, anomalies = write_csv_stream(score_stream(uploaded_file, model), out)
+            except BaseException:
+                os.unlink(out.name)
+                raise
+            return out.name, rows, anomalies
+
+        stream_key = (upload_hash(uploaded_file), int(sample_size))
+        with st.spinner("Scoring file in chunks..."):
+            _, n_rows, n_anomalies = stream_cache().get_or_fit(stream_key, score_upload, persist=False)
+
+        def open_results():
+            """Look the scored file up again at click time; the one rendered may have been evicted and deleted."""
+            return open(stream_cache().get_or_fit(stream_key, score_upload, persist=False)[0], "rb")
+
+        st.subheader("Anomaly Detection Results")
+        st.write(f"Scored **{n_rows:,}** rows, flagged **{n_anomalies:,}** as anomalies.")
+        st.download_button(
+            "⬇ Download Results", data=telemetry.sized("download.anomaly_results", open_results), file_name="anomaly_results.csv", mime="text/csv"
+        )
     else:
-        rng = np.random.RandomState(42)
-        df = pd.DataFrame({
-            "transaction_amount": rng.normal(100, 20, 200),
-            "transaction_time": rng.randint(0, 24, 200),
-            "merchant_id": rng.randint(1, 50, 200)
-        })
-
-    st.subheader("Dataset Preview")
-    st.dataframe(df.head())
+        df = None
+        data_key = ("sample",)  # identifies the dataset behind the cached frame and feature matrix
+        if uploaded_file:
+            # identical bytes uploaded by any session share one parsed frame (and so one fit)
+            upload_key = (upload_hash(uploaded_file), ingest_mode)
+            if ingest_mode == "Chunked (memory-bounded)":
+                try:
+                    df = frame_cache().get_or_fit(
+                        upload_key, lambda: read_csv_chunked(uploaded_file, memory_budget_mb=budget_mb)
+                    )
+                except MemoryError as e:
+                    st.error(f"{e} Showing the sample dataset instead.")
+            else:
+                df = frame_cache().get_or_fit(upload_key, lambda: pd.read_csv(uploaded_file))
+            if df is not None:
+                data_key = upload_key
+        if df is None:
+            df = sample_transactions()
+
+        st.subheader("Dataset Preview")
+        st.dataframe(df.head())
+
+        model_choice = st.selectbox("Choose Model", MODEL_CHOICES + [ENSEMBLE])
+        scalable_lof = parallel = sharded = False
+        if model_choice == "Isolation Forest":
+            execution = st.radio(
+                "Execution",
+                ["Single model", "Parallel (multi-core)", "Sharded per merchant"],
+                horizontal=True,
+                help="Parallel builds trees on several cores and scores row partitions in a process pool. "
+                     "Sharded trains one forest per merchant (small merchants share a global model).",
+            )
+            parallel = execution == "Parallel (multi-core)"
+            sharded = execution == "Sharded per merchant"
+            max_workers = os.cpu_count() or 1
+            n_workers = st.slider("Workers", min_value=1, max_value=max_workers, value=max_workers) if max_workers > 1 else 1
+            if sharded:
+                id_cols = [c for c in df.columns if str(c).lower().endswith("id")] or list(df.columns)
+                shard_col = st.selectbox("Shard by", id_cols)
+                min_shard_rows = st.number_input("Minimum rows for a dedicated model", min_value=16, max_value=100_000, value=256)
+        elif model_choice == "Local Outlier Factor":
+            scalable_lof = st.checkbox(
+                "Scalable LOF (subsample + novelty scoring, all cores)",
+                help="Fits LOF on a random subsample and scores the remaining rows against it.",
+            )
+            lof_subsample = st.number_input("LOF subsample size", min_value=1_000, max_value=1_000_000, value=50_000, step=5_000)
+
+        engineered = st.checkbox(
+            "Engineered features",
+            help="Robust-scaled numerics, per-merchant amount z-scores, cyclical hour of day "
+                 "and frequency-encoded IDs instead of the raw columns.",
+        )
 
-    model_choice = st.selectbox("Choose Model", ["Isolation Forest", "Local Outlier Factor"])
+        def engineer() -> FeatureMatrix:
+            # the fitted preprocessing goes to the model store with the detectors, so a fresh
+            # process reuses it instead of refitting
+            transformer = model_cache().get_or_fit(
+                cache_key(df, "TransactionFeatures", {}), lambda: TransactionFeatures().fit(df)
+            )
+            return transformer.transform(df)
+
+        # one float32 feature matrix per dataset, shared by the models, SHAP and the views
+        if engineered:
+            X = feature_cache().get_or_fit(data_key + ("engineered",), engineer)
+            st.caption("Features: " + ", ".join(f"`{c}`" for c in X.columns))
+        else:
+            X = feature_cache().get_or_fit(data_key, lambda: FeatureMatrix.from_frame(df))
+        feature_cols = X.columns
+
+        # fitted models are shared across reruns and sessions; keyed by data + params
+        if sharded:
+            shard_keys = df[shard_col].to_numpy()
+            shard_params = {
+                "by": shard_col,
+                "keys": dataset_fingerprint(df[[shard_col]]),
+                "min_rows": int(min_shard_rows),
+                "workers": int(n_workers),
+            }
+            model, scores, shard_report = model_cache().get_or_fit(
+                cache_key(X, "Sharded Isolation Forest", shard_params),
+                lambda: fit_sharded_forest(X, shard_keys, min_shard_rows=int(min_shard_rows), n_workers=int(n_workers)),
+            )
+            st.caption(
+                f"{shard_report['shards']} shard models{' (hashed buckets)' if shard_report['bucketed'] else ''} · "
+                f"{shard_report['fallback_rows']:,} rows on the shared model · fit {shard_report['fit_seconds']:.2f}s "
+                f"on {shard_report['workers']} workers"
+            )
+        elif parallel:
+            par_params = {"workers": int(n_workers)}
+            model, scores, par_report = model_cache().get_or_fit(
+                cache_key(X, "Parallel Isolation Forest", par_params),
+                lambda: fit_parallel_forest(X, n_workers=int(n_workers)),
+            )
+            st.caption(
+                f"{par_report['workers']} workers · fit {par_report['fit_seconds']:.2f}s · "
+                f"score {par_report['score_seconds']:.2f}s · scoring speedup vs. serial "
+                f"(estimated): {par_report['score_speedup']:.1f}×"
+            )
+        elif scalable_lof:
+            lof_params = {"subsample": int(lof_subsample)}
+            model, scores, lof_report = model_cache().get_or_fit(
+                cache_key(X, "Scalable LOF", lof_params), lambda: fit_scalable_lof(X, **lof_params)
+            )
+            st.caption(
+                f"Neighbour search: `{lof_report['algorithm']}` · fitted on {lof_report['fit_rows']:,} "
+                f"of {lof_report['rows']:,} rows · label disagreement vs exact LOF on a validation "
+                f"sample: {lof_report['label_disagreement']:.1%}"
+            )
+        elif model_choice == ENSEMBLE:
+            model = None
+            ens_scores, scores, ens_seconds = ensemble_scores(X, cache=model_cache())
+            timings = " · ".join(f"{name} {secs:.2f}s" for name, secs in ens_seconds.items() if name != "wall")
+            st.caption(
+                f"Ran concurrently in {ens_seconds['wall']:.2f}s wall-clock ({timings}). "
+                "Fused score = mean of rank-normalised model scores."
+            )
+        else:
+            model, scores = score_anomalies(X, model_choice, cache=model_cache())
 
-    if model_choice == "Isolation Forest":
-        model = IsolationForest(contamination=0.05, random_state=42)
-        preds = model.fit_predict(df.select_dtypes(include=[np.number]))
-    else:
-        model = LocalOutlierFactor(n_neighbors=20, contamination=0.05)
-        preds = model.fit_predict(df.select_dtypes(include=[np.number]))
+        # raw scores are kept, so moving the threshold only relabels rows
+        st.subheader("Anomaly Threshold")
+        contamination = st.slider(
+            "Contamination (expected share of anomalies)", min_value=0.005, max_value=0.5, value=0.05, step=0.005
+        )
+        cut = score_threshold(scores, contamination)
+        preds = np.where(scores > cut, -1, 1)
+        counts, edges = np.histogram(scores, bins=50)
+        hist = pd.DataFrame({"score": edges[:-1], "score_end": edges[1:], "rows": counts})
+        hist_chart = alt.Chart(hist).mark_bar(color="#0a2540").encode(
+            x=alt.X("score:Q", title="Anomaly score (higher = more anomalous)"), x2="score_end:Q", y="rows:Q"
+        ) + alt.Chart(pd.DataFrame({"cut": [cut]})).mark_rule(color="#ff6600").encode(x="cut:Q")
+        st.altair_chart(hist_chart, use_container_width=True)
+        st.caption(f"{int((preds == -1).sum()):,} of {len(preds):,} rows above the threshold {cut:.4f}")
+        if model_choice == ENSEMBLE:
+            ens_labels = {name: threshold_labels(v, contamination) for name, v in ens_scores.items()}
+            ens_labels["Fused"] = preds
+            st.markdown("**Model agreement** (share of rows with the same label)")
+            st.dataframe(label_agreement(ens_labels).style.format("{:.1%}"))
+
+        df = df.assign(**{"Anomaly Score": scores})  # cached frames are shared, never modified
+        labels = np.where(preds == -1, "Yes", "No")
+
+        st.subheader("Anomaly Detection Results")
+        # only the current page is sent to the browser; sort orders are cached per dataset
+        # the view holds the whole frame, text columns included, so it is keyed by the dataset itself
+        view = results_cache().get_or_fit(
+            ("view",) + data_key + (dataset_fingerprint(scores),), lambda: ResultsView(df)
+        )
+        numeric_cols = [c for c, dtype in df.dtypes.items() if pd.api.types.is_numeric_dtype(dtype)]
+        with st.expander("🔎 Filter & sort"):
+            f1, f2, f3 = st.columns(3)
+            anomalies_only = f1.checkbox("Anomalies only")
+            sort_by = f2.selectbox("Sort by", ["(none)"] + list(df.columns))
+            descending = f3.checkbox("Descending", value=True)
+            r1, r2 = st.columns(2)
+            range_col = r1.selectbox("Range filter column", ["(none)"] + numeric_cols)
+            ranges = {}
+            if range_col != "(none)":
+                lo, hi = view.bounds(range_col)
+                if lo < hi:
+                    ranges[range_col] = r2.slider("Range", min_value=lo, max_value=hi, value=(lo, hi))
+            top_n = st.number_input("Top N rows (0 = all)", min_value=0, max_value=len(view), value=0)
+        idx = view.query(
+            anomaly_mask=(preds == -1) if anomalies_only else None,
+            ranges=ranges,
+            sort_by=None if sort_by == "(none)" else sort_by,
+            descending=descending,
+            top_n=int(top_n),
+        )
+        p1, p2 = st.columns(2)
+        page_size = p1.selectbox("Rows per page", [25, 50, 100, 500], index=1)
+        n_pages = max(1, -(-len(idx) // page_size))
+        page = p2.number_input("Page", min_value=1, max_value=n_pages, value=1)
+        st.dataframe(view.page(idx, int(page) - 1, page_size, extra={"Anomaly": labels}))
+        st.caption(f"{len(idx):,} matching rows · page {int(page)} of {n_pages}")
+
+        # Optional: safe SHAP import
+        try:
+            import shap
+            import matplotlib.pyplot as plt
+            if model_choice == "Isolation Forest" and not sharded:
+                st.subheader("Model Explainability (SHAP)")
+                shap_params = {"model": model_fingerprint(model), "max_rows": 300, "background": "kmeans"}
+                # tree explainer on a sampled background; values cached per model + data
+                shap_values, shap_rows = model_cache().get_or_fit(
+                    cache_key(X, "SHAP", shap_params), lambda: explain_forest(model, X)
+                )
+                st.caption(f"Explaining {len(shap_rows):,} sampled rows against a 50-row k-means background.")
+                fig, ax = plt.subplots()
+                shap.summary_plot(shap_values, shap_rows, feature_names=feature_cols, show=False)
+                st.pyplot(fig)
+        except ModuleNotFoundError:
+            st.info("Install matplotlib + shap to enable explainability.")
+
+        # the export is only built when the button is clicked, and written in chunks
+        export_fmt = st.selectbox("Download format", available_export_formats())
+        ext, mime = EXPORT_FORMATS[export_fmt]
+        st.download_button(
+            "⬇ Download Results",
+            data=telemetry.sized("download.anomaly_results", lambda: export_file(df.assign(Anomaly=labels), export_fmt)),
+            file_name=f"anomaly_results{ext}",
+            mime=mime,
+        )
 
-    df["Anomaly"] = np.where(preds == -1, "Yes", "No")
+    # --- Online mode: score rows appended to a growing feed ---
+    with st.expander("📡 Online mode: score newly appended transactions"):
+        data_dir = Path(__file__).parent / "data"
+        feed_path = str(data_dir / "feed.csv")  # gitignored; the tracked sample is never appended to
 
-    st.subheader("Anomaly Detection Results")
-    st.dataframe(df)
+        @st.cache_resource
+        def online_feed(path: str) -> OnlineFeed:
+            """Half-space-trees detector fitted once on the feed, updated per batch."""
+            if not os.path.exists(path):
+                import shutil
 
-    # Optional: safe SHAP import
-    try:
-        import shap
-        import matplotlib.pyplot as plt
-        if model_choice == "Isolation Forest":
-            st.subheader("Model Explainability (SHAP)")
-            explainer = shap.Explainer(model, df.select_dtypes(include=[np.number]))
-            shap_values = explainer(df.select_dtypes(include=[np.number]))
-            fig, ax = plt.subplots()
-            shap.summary_plot(shap_values, df.select_dtypes(include=[np.number]), show=False)
-            st.pyplot(fig)
-    except ModuleNotFoundError:
-        st.info("Install matplotlib + shap to enable explainability.")
+                shutil.copyfile(data_dir / "sample_transactions.csv", path)
+            return OnlineFeed(path)
 
-    csv_bytes = df.to_csv(index=False).encode("utf-8")
-    st.download_button("⬇ Download Results", data=csv_bytes, file_name="anomaly_results.csv", mime="text/csv")
+        st.caption(
+            "Feed: `data/feed.csv` (seeded from the sample) · each poll reads only the appended rows and scores them "
+            "against the streaming model, so latency depends on the batch size, not the history."
+        )
+        feed = online_feed(feed_path)
+        o1, o2 = st.columns(2)
+        if o1.button("Simulate incoming batch (100 rows)"):
+            append_synthetic_rows(feed_path, n=100, template=feed.template)
+        if o2.button("Score new rows"):
+            new_rows, seconds = feed.poll()
+            st.write(
+                f"Scored **{len(new_rows):,}** new rows in {seconds * 1000:.1f} ms · "
+                f"{int((new_rows['Anomaly'] == 'Yes').sum()) if len(new_rows) else 0} flagged · "
+                f"{feed.rows_seen:,} rows seen in total"
+            )
+            if len(new_rows):
+                st.dataframe(new_rows.head(50))
 
 #DEV OPS PROJECT!!!
-with tab9:
+def render_devops():
     st.header("DevOps CI/CD for Flask App (2024)")
 
     # --- Tech stack ---
@@ -800,39 +1121,204 @@ with tab9:
     for tech in ["GitHub Actions", "Docker", "Flask", "Python"]:
         pill(tech)
 
-    # --- Flask API Simulation ---
+    # --- Prediction API ---
+    import pandas as pd
+    from anomaly import sample_transactions
+    from serving import MicroBatcher, Predictor, call_endpoint, measure_concurrency, start_server
+
+    @st.cache_resource
+    def prediction_server():
+        """Local /hello + /predict service, started once per process with the dashboard's model."""
+        return start_server(Predictor.fit(sample_transactions(), cache=model_cache()), batch_items=64, batch_wait_ms=2.0)
+
     st.subheader("Flask API Simulation")
+    server = prediction_server()
+    st.caption(
+        f"A real HTTP service on `{server.url}` serving the Isolation Forest fitted on the Dashboard "
+        "Project's sample data. The model is loaded once when the service starts; each call only scores, "
+        "and concurrent /predict calls are micro-batched into one model call."
+    )
     endpoint = st.selectbox("Choose endpoint", ["/hello", "/predict"])
-    
+
+    payload = None
     if endpoint == "/predict":
-        user_input = st.number_input("Input a number for prediction", min_value=0, max_value=100, value=42)
-    
+        c1, c2, c3 = st.columns(3)
+        amount = c1.number_input("Transaction amount", min_value=0.0, value=950.0, step=10.0)
+        hour = c2.number_input("Transaction hour", min_value=0, max_value=23, value=3)
+        merchant = c3.number_input("Merchant id", min_value=1, max_value=49, value=7)
+        payload = {"instances": [
+            {"transaction_amount": amount, "transaction_time": hour, "merchant_id": merchant}
+        ]}
+
     if st.button("Call Endpoint"):
-        if endpoint == "/hello":
-            st.success("Hello, world! 🌎 Flask app response.")
+        try:
+            status, body, seconds = call_endpoint(server.url + endpoint, payload)
+        except OSError as e:
+            st.error(f"Service unreachable: {e}")
         else:
-            # Simple dynamic mock prediction
-            pred = user_input * 2 + 3
-            st.json({"input": user_input, "prediction": pred})
+            c1, c2 = st.columns(2)
+            c1.metric("Round-trip latency", f"{seconds * 1000:.1f} ms")
+            if "model_ms" in body:
+                c2.metric("Model time", f"{body['model_ms']:.1f} ms")
+            (st.json if status == 200 else st.error)(body)
+
+    with st.expander("⚡ Micro-batching benchmark"):
+        st.caption(
+            "Concurrent callers score one row each, either straight against the model or through a "
+            "batcher that waits up to the given time (or item count) and scores the whole batch at once."
+        )
+        c1, c2, c3, c4 = st.columns(4)
+        concurrency = c1.slider("Concurrency", 1, 128, 32)
+        batch_wait_ms = c2.number_input("Max wait (ms)", min_value=0.0, max_value=50.0, value=2.0, step=0.5)
+        batch_items = c3.number_input("Max items", min_value=2, max_value=1024, value=64)
+        n_requests = c4.number_input("Requests", min_value=100, max_value=20_000, value=1_000, step=100)
+        if st.button("Run benchmark"):
+            predictor = server.predictor
+            row = predictor.matrix([[950, 3, 7]])
+            batcher = MicroBatcher(predictor.predict, int(batch_items), batch_wait_ms)
+            try:
+                with st.spinner("Scoring..."):
+                    direct = measure_concurrency(lambda: predictor.predict(row), concurrency, int(n_requests))
+                    batched = measure_concurrency(lambda: batcher.predict(row), concurrency, int(n_requests))
+            finally:
+                batcher.close()
+            st.dataframe(
+                pd.DataFrame({"One call per request": direct, "Micro-batched": batched}).T.style.format("{:,.1f}")
+            )
+            st.caption(
+                f"Mean batch size {batcher.mean_batch_size:.1f} rows · "
+                f"{batched['requests/s'] / direct['requests/s']:.1f}x throughput at concurrency {concurrency}."
+            )
+
+    with st.expander("🚦 Load test"):
+        import altair as alt
+        from loadtest import run_load_test, summarize
+
+        st.caption(
+            "Each client is a thread with its own keep-alive connection that calls the selected endpoints "
+            "in turn until the time is up."
+        )
+        c1, c2, c3 = st.columns(3)
+        load_endpoints = c1.multiselect("Endpoints", ["/hello", "/predict"], default=["/hello", "/predict"])
+        load_clients = c2.slider("Concurrent clients", 1, 64, 16)
+        load_duration = c3.slider("Duration (s)", 1, 30, 5)
+        if st.button("Run load test", disabled=not load_endpoints):
+            with st.spinner(f"Driving {server.url} with {load_clients} clients for {load_duration}s..."):
+                samples = run_load_test(server.url, load_endpoints, load_clients, load_duration)
+            st.session_state["load_test"] = (samples, summarize(samples, load_duration))
+
+        if "load_test" in st.session_state:
+            samples, summary = st.session_state["load_test"]
+            overall = summary.iloc[-1]
+            c1, c2, c3, c4 = st.columns(4)
+            c1.metric("Throughput", f"{overall['requests/s']:,.0f} req/s")
+            c2.metric("Error rate", f"{overall['error rate']:.2%}")
+            c3.metric("p50", f"{overall['p50 ms']:.1f} ms")
+            c4.metric("p99", f"{overall['p99 ms']:.1f} ms")
+            st.dataframe(summary.style.format({
+                "requests": "{:,.0f}", "requests/s": "{:,.1f}", "error rate": "{:.2%}",
+                "p50 ms": "{:.2f}", "p95 ms": "{:.2f}", "p99 ms": "{:.2f}",
+            }))
+            ok = samples[samples["error"] == ""]
+            percentiles = summary.loc[summary.index[-1], ["p50 ms", "p95 ms", "p99 ms"]]
+            latency_chart = alt.Chart(ok).mark_bar(opacity=0.7).encode(
+                x=alt.X("latency_ms:Q", bin=alt.Bin(maxbins=60), title="Latency (ms)"),
+                y=alt.Y("count()", stack=None, title="Requests"),
+                color="endpoint:N",
+            ) + alt.Chart(pd.DataFrame({"percentile": percentiles.index, "ms": percentiles.to_numpy()})).mark_rule(
+                color="#ff6600"
+            ).encode(x="ms:Q", tooltip=["percentile", alt.Tooltip("ms:Q", format=".2f")])
+            st.altair_chart(latency_chart, use_container_width=True)
+            st.download_button(
+                "Download samples (CSV)",
+                data=telemetry.sized("download.load_test", lambda: samples.to_csv(index=False).encode("utf-8")),
+                file_name="load_test.csv",
+                mime="text/csv",
+            )
 
     # --- CI/CD Pipeline Simulation ---
-    st.subheader("CI/CD Pipeline")
-    pipeline_steps = [
-        "Code Commit", "Lint Code", "Run Unit Tests", 
-        "Build Docker Image", "Push Docker Image", 
-        "Deploy to Staging", "Smoke Tests", "Deploy to Production"
-    ]
+    from pipeline import CACHED, FAILED, OK, PIPELINE_STEPS, RUNNING, SKIPPED, WARNING, JobRunner
 
-    if st.button("Run CI/CD Pipeline"):
-        import time
-        placeholder = st.empty()
-        progress = st.progress(0)
-        for i, step in enumerate(pipeline_steps):
-            color = "✅" if step != "Run Unit Tests" else "⚠️"  # simulate warning
-            placeholder.markdown(f"{step} {color}")
-            progress.progress(int((i+1)/len(pipeline_steps)*100))
-            time.sleep(0.7)
-        st.success("CI/CD pipeline finished!")
+    @st.cache_resource
+    def pipeline_runner() -> JobRunner:
+        """Worker pools and step cache shared by every session's pipeline runs."""
+        return JobRunner(max_jobs=1, step_workers=4)
+
+    st.subheader("CI/CD Pipeline")
+    st.caption(
+        "Real shell steps run as a dependency graph: lint and unit tests run side by side and the build waits "
+        "for both. Steps whose command, source files and upstream steps are unchanged, and whose output files "
+        "still exist, reuse their last result."
+    )
+    runner = pipeline_runner()
+    c1, c2 = st.columns([1, 3])
+    use_step_cache = c2.checkbox("Reuse cached steps", value=True)
+    ci_job = runner.get(st.session_state.get("ci_job", ""))
+    # one run per session at a time; the runner also caps the shared queue
+    if c1.button("Run CI/CD Pipeline", disabled=ci_job is not None and not ci_job.done):
+        try:
+            st.session_state["ci_job"] = runner.submit(PIPELINE_STEPS, use_cache=use_step_cache).id
+        except RuntimeError as e:
+            st.warning(str(e))
+        else:
+            st.rerun()  # redraw the button disabled while the run is in flight
+    polling = ci_job is not None and not ci_job.done
+
+    # only this block reruns while the job is in flight; the rest of the page stays interactive
+    @st.fragment(run_every=0.5 if polling else None)
+    def pipeline_progress():
+        import altair as alt
+        import pandas as pd
+
+        job = runner.get(st.session_state.get("ci_job", ""))
+        if job is None:
+            return
+        icons = {OK: "✅", WARNING: "⚠️", FAILED: "❌", RUNNING: "⏳", CACHED: "♻️", SKIPPED: "⏭️"}
+        st.progress(job.progress, text=f"Run `{job.id}` · {job.state} · {runner.active()} active run(s) on the server")
+        for step in job.steps:
+            result = job.results.get(step.name)
+            took = f" · {result.seconds:.2f}s" if result else ""
+            after = f" (after {', '.join(step.deps)})" if step.deps else ""
+            st.markdown(f"{icons.get(job.status[step.name], '▫️')} {step.name}{took}{after}")
+        if not job.done:
+            return
+        if job.error:
+            st.error(f"CI/CD pipeline failed at {job.error}")
+        else:
+            st.success(f"CI/CD pipeline finished in {job.wall_seconds:.1f}s!")
+
+        seconds = job.seconds()
+        path, path_seconds = job.critical_path()
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("Wall time", f"{job.wall_seconds:.2f}s")
+        c2.metric("Sum of step times", f"{sum(seconds.values()):.2f}s")
+        c3.metric("Saved by parallel stages", f"{max(sum(seconds.values()) - job.wall_seconds, 0):.2f}s")
+        c4.metric("Saved by step cache", f"{job.cache_saved():.2f}s")
+        if path_seconds > 0:
+            st.markdown(f"**Critical path** ({path_seconds:.2f}s): " + " → ".join(path))
+        timeline = pd.DataFrame([
+            {"step": name, "start": r.started - job.started, "end": r.started - job.started + r.seconds,
+             "status": job.status[name]}
+            for name, r in job.results.items() if job.status[name] not in (CACHED, SKIPPED)
+        ])
+        if not timeline.empty:
+            st.altair_chart(
+                alt.Chart(timeline).mark_bar().encode(
+                    x=alt.X("start:Q", title="Seconds since start"), x2="end:Q",
+                    y=alt.Y("step:N", sort=[s.name for s in job.steps], title=None),
+                    color=alt.condition(alt.FieldOneOfPredicate("step", path), alt.value("#ff6600"), alt.value("#0a2540")),
+                    tooltip=["step", "status", alt.Tooltip("start:Q", format=".2f"), alt.Tooltip("end:Q", format=".2f")],
+                ),
+                use_container_width=True,
+            )
+        with st.expander("Step output"):
+            for name, r in job.results.items():
+                st.markdown(f"**{name}** ({job.status[name]})")
+                st.code(r.output or "(no output)")
+        if polling:
+            st.rerun()  # full rerun so the fragment stops polling
+
+    pipeline_progress()
 
     # --- Deployment Dashboard ---
     st.subheader("Deployment Status")
@@ -840,16 +1326,51 @@ with tab9:
         st.markdown(f"**{env}:** Running ✅")
 
     # --- Metrics ---
-    st.subheader("Mock Metrics")
-    import pandas as pd, numpy as np
-    df_metrics = pd.DataFrame({
-        "Time": pd.date_range("2025-09-14 10:00", periods=10, freq="H"),
-        "Requests Served": np.random.randint(50, 200, 10),
-        "Response Time (ms)": np.random.randint(80, 300, 10)
-    })
-    st.line_chart(df_metrics.set_index("Time"))
+    st.subheader("Live Metrics")
+    st.caption(
+        "Recorded by this app about itself across all sessions: one ring buffer per metric holds the "
+        "most recent values, so recording is constant-time and memory stays fixed. Refreshes every 5 seconds."
+    )
 
-with tab10:
+    @st.fragment(run_every="5s")
+    def live_metrics():
+        import altair as alt
+
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("Reruns", f"{telemetry.count('app.reruns'):,}")
+        c2.metric("Model fits", f"{telemetry.count('model.fit_seconds'):,}")
+        downloads = telemetry.frame("download.")
+        c3.metric("Downloads", f"{len(downloads):,}")
+        c4.metric("Bytes downloaded", f"{downloads['value'].sum() / 1024 ** 2:,.2f} MB")
+
+        renders = telemetry.frame("render.")
+        if not renders.empty:
+            renders["ms"] = renders["value"] * 1000
+            st.altair_chart(
+                alt.Chart(renders).mark_line(point=True).encode(
+                    x=alt.X("time:T", title=None),
+                    y=alt.Y("ms:Q", title="Render time (ms)", scale=alt.Scale(type="symlog")),
+                    color=alt.Color("metric:N", title="Tab"),
+                    tooltip=["metric", "time:T", alt.Tooltip("ms:Q", format=",.1f")],
+                ),
+                use_container_width=True,
+            )
+        fits = telemetry.series("model.fit_seconds")
+        if not fits.empty:
+            st.altair_chart(
+                alt.Chart(fits).mark_circle(size=60, color="#ff6600").encode(
+                    x=alt.X("time:T", title=None), y=alt.Y("value:Q", title="Model fit time (s)")
+                ),
+                use_container_width=True,
+            )
+        if not downloads.empty:
+            sizes = downloads.groupby("metric")["value"].agg(["count", "sum", "mean"])
+            sizes.columns = ["downloads", "total bytes", "mean bytes"]
+            st.dataframe(sizes.style.format("{:,.0f}"))
+
+    live_metrics()
+
+def render_nasa():
     st.header("NASA L’SPACE — Lunar Rover Systems Concept (Data Track) (2024)")
 
     # Project description
@@ -922,4 +1443,23 @@ with tab10:
     st.markdown("---")
     st.subheader("Download Simulated Dataset")
     csv_bytes = df.to_csv(index=False).encode("utf-8")
-    st.download_button("⬇️ Download Mission Definition Review (MDR)", data=csv_bytes, file_name="MDR.csv", mime="text/csv")
+    st.download_button("⬇️ Download Mission Definition Review (MDR)", data=telemetry.sized("download.MDR", lambda: csv_bytes), file_name="MDR.csv", mime="text/csv")
+
+
+# ----------------------
+# Render the selected section
+# ----------------------
+SECTIONS = {
+    "Home": render_home,
+    "Resume": render_resume,
+    "Projects": render_projects,
+    "Skills": render_skills,
+    "Contact": render_contact,
+    "Interests and Hobbies": render_interests,
+    "Organizations": render_organizations,
+    "Dashboard Project": render_dashboard,
+    "DevOps Flask Project": render_devops,
+    "Nasa Project": render_nasa,
+}
+with telemetry.timer(f"render.{section}"):
+    SECTIONS[section]()
@@ -0,0 +1,80 @@
+"""Score every CSV in a directory with the Dashboard Project anomaly pipeline.
+
+Runs the same load, feature matrix, detector and labelling steps as the
+dashboard tab, one file per worker process, and writes each result as soon
+as it finishes:
+
+    python score_batch.py data/incoming --output-dir data/scored --workers 4
+    python score_batch.py data/incoming --model "Local Outlier Factor" --engineered
+
+Exits non-zero if any file failed, so it can run from cron.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import List, Optional
+
+from anomaly import DEFAULT_PARAMS, MODEL_CHOICES, score_csv_file
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("input_dir", type=Path, help="directory of CSV files to score")
+    parser.add_argument("--output-dir", type=Path, help="where to write results (default: <input_dir>/scored)")
+    parser.add_argument("--pattern", default="*.csv", help="glob for input files")
+    parser.add_argument("--model", default="Isolation Forest", choices=MODEL_CHOICES)
+    parser.add_argument("--contamination", type=float, help="expected anomaly share (default: the model's)")
+    parser.add_argument("--engineered", action="store_true", help="use the engineered transaction features")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument("--memory-budget-mb", type=float, default=512, help="per-file parse budget")
+    args = parser.parse_args(argv)
+
+    files = sorted(p for p in args.input_dir.glob(args.pattern) if p.is_file())
+    if not files:
+        print(f"No files matching {args.pattern} in {args.input_dir}", file=sys.stderr)
+        return 1
+    out_dir = args.output_dir or args.input_dir / "scored"
+    if out_dir.resolve() == args.input_dir.resolve():
+        print("--output-dir must differ from the input directory; results would overwrite the sources",
+              file=sys.stderr)
+        return 2
+    out_dir.mkdir(parents=True, exist_ok=True)
+    params = dict(DEFAULT_PARAMS[args.model])
+    if args.contamination is not None:
+        params["contamination"] = args.contamination
+
+    t0 = time.perf_counter()
+    total_rows = failures = 0
+    with ProcessPoolExecutor(max_workers=max(1, min(args.workers, len(files)))) as pool:
+        futures = {
+            pool.submit(
+                score_csv_file, src, out_dir / src.name, args.model, params, args.engineered, args.memory_budget_mb
+            ): src
+            for src in files
+        }
+        for future in as_completed(futures):
+            src = futures[future]
+            try:
+                r = future.result()
+            except Exception as e:
+                failures += 1
+                print(f"FAILED {src.name}: {e}", file=sys.stderr)
+                continue
+            total_rows += r["rows"]
+            rate = r["rows"] / r["seconds"] if r["seconds"] > 0 else float("inf")
+            print(f"{src.name:<30} {r['rows']:>10,} rows  {r['anomalies']:>8,} anomalies  "
+                  f"{r['seconds']:>8.2f}s  {rate:>12,.0f} rows/s")
+
+    wall = time.perf_counter() - t0
+    print(f"Scored {len(files) - failures}/{len(files)} files, {total_rows:,} rows in {wall:.2f}s "
+          f"({total_rows / wall:,.0f} rows/s) -> {out_dir}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
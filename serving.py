@@ -0,0 +1,330 @@
+"""Local HTTP scoring service for the Dashboard Project anomaly model.
+
+The DevOps tab starts it in-process on an ephemeral localhost port; it can
+also run on its own:
+
+    python serving.py --port 8000
+    curl localhost:8000/hello
+    curl -d '{"instances": [{"transaction_amount": 950, "transaction_time": 3, "merchant_id": 7}]}' \
+        localhost:8000/predict
+
+Built on the standard library's threading HTTP server so it adds no
+dependencies. The model is fitted (or loaded from a cache) once when the
+service starts; requests only score.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from anomaly import (
+    DEFAULT_PARAMS, FeatureMatrix, ModelCache, anomaly_scores, sample_transactions, score_anomalies,
+    score_threshold,
+)
+
+
+# ----------------------
+# Predictor
+# ----------------------
+
+class Predictor:
+    """A fitted detector with the feature columns and score cut it was trained with."""
+
+    def __init__(self, model, columns: List[str], threshold: float, model_choice: str = "Isolation Forest"):
+        self.model = model
+        self.columns = list(columns)
+        self.threshold = threshold
+        self.model_choice = model_choice
+
+    @classmethod
+    def fit(
+        cls,
+        df: pd.DataFrame,
+        model_choice: str = "Isolation Forest",
+        params: Optional[Dict[str, Any]] = None,
+        cache: Optional[ModelCache] = None,
+    ) -> "Predictor":
+        """Fit on ``df`` the way the dashboard does, so both share cache entries."""
+        params = dict(DEFAULT_PARAMS[model_choice] if params is None else params)
+        if model_choice == "Local Outlier Factor":
+            params["novelty"] = True  # plain LOF cannot score rows it was not fitted on
+        X = FeatureMatrix.from_frame(df)
+        model, scores = score_anomalies(X, model_choice, params, cache)
+        return cls(model, X.columns, score_threshold(scores, params.get("contamination", 0.05)), model_choice)
+
+    def matrix(self, instances: List[Any]) -> np.ndarray:
+        """Turn JSON instances (dicts keyed by column, or plain lists) into a float32 matrix.
+
+        Raises ValueError for anything that is not a finite number (``null``,
+        ``NaN``, ``Infinity``, nested lists), so a bad row is a 400 for its own
+        request instead of a confident label or a failed micro-batch.
+        """
+        if not instances:
+            raise ValueError("no instances given")
+        rows = []
+        for inst in instances:
+            if isinstance(inst, dict):
+                missing = [c for c in self.columns if c not in inst]
+                if missing:
+                    raise ValueError(f"missing fields: {', '.join(missing)}")
+                rows.append([inst[c] for c in self.columns])
+            else:
+                if len(inst) != len(self.columns):
+                    raise ValueError(f"expected {len(self.columns)} values per row, got {len(inst)}")
+                rows.append(inst)
+        X = np.asarray(rows, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != len(self.columns):
+            raise ValueError(f"expected rows of {len(self.columns)} numbers, got an array of shape {X.shape}")
+        if not np.isfinite(X).all():
+            bad = sorted({self.columns[j] for j in np.nonzero(~np.isfinite(X))[1]})
+            raise ValueError(f"non-finite values in: {', '.join(bad)}")
+        return X
+
+    def predict(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Return ``(scores, is_anomaly)`` for the rows of ``X``."""
+        scores = anomaly_scores(self.model, X)
+        return scores, scores > self.threshold
+
+
+# ----------------------
+# Micro-batching
+# ----------------------
+
+class MicroBatcher:
+    """Collect concurrent predict calls into one vectorised batch.
+
+    A single worker thread takes the first waiting request, then keeps
+    taking more until ``max_items`` rows are queued or ``max_wait_ms`` has
+    passed. It scores them all in one ``predict`` call and hands each caller
+    back its slice, so per-call model overhead is paid once per batch.
+    """
+
+    def __init__(self, predict: Callable[[np.ndarray], Tuple[np.ndarray, np.ndarray]], max_items: int = 64, max_wait_ms: float = 2.0):
+        if max_items < 1:
+            raise ValueError("max_items must be at least 1")
+        self._predict = predict
+        self.max_items = max_items
+        self.max_wait = max_wait_ms / 1000
+        self.batches = 0
+        self.items = 0
+        self._queue: "queue.Queue[Optional[Tuple[np.ndarray, Future]]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, X: np.ndarray) -> Future:
+        future: Future = Future()
+        self._queue.put((X, future))
+        return future
+
+    def predict(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Drop-in for ``Predictor.predict`` that blocks until the batch is scored."""
+        return self.submit(X).result()
+
+    @property
+    def mean_batch_size(self) -> float:
+        return self.items / self.batches if self.batches else 0.0
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            rows = len(first[0])
+            deadline = time.perf_counter() + self.max_wait
+            while rows < self.max_items:
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+                rows += len(item[0])
+            self._score(batch)
+
+    def _score(self, batch: List[Tuple[np.ndarray, Future]]) -> None:
+        try:
+            scores, flags = self._predict(np.concatenate([X for X, _ in batch]))
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+            else:  # score one at a time so only the bad request sees the error
+                for item in batch:
+                    self._score([item])
+            return
+        self.batches += 1
+        self.items += len(scores)
+        start = 0
+        for X, future in batch:
+            end = start + len(X)
+            future.set_result((scores[start:end], flags[start:end]))
+            start = end
+
+    def close(self) -> None:
+        """Score whatever is queued, then stop the worker thread."""
+        self._queue.put(None)
+        self._thread.join()
+
+
+def measure_concurrency(
+    call: Callable[[], Any], concurrency: int = 16, n_requests: int = 1_000
+) -> Dict[str, float]:
+    """Fire ``n_requests`` calls from ``concurrency`` threads; return throughput and latency percentiles."""
+    def timed(_) -> float:
+        t0 = time.perf_counter()
+        call()
+        return time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = np.fromiter(pool.map(timed, range(n_requests)), dtype=float, count=n_requests)
+    wall = time.perf_counter() - t0
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+    return {"requests/s": n_requests / wall, "p50 ms": float(p50), "p99 ms": float(p99)}
+
+
+# ----------------------
+# HTTP service
+# ----------------------
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "PredictionServer"
+    protocol_version = "HTTP/1.1"  # keep-alive, so clients can reuse a connection
+    disable_nagle_algorithm = True  # headers and body go out as separate writes; don't wait on delayed ACKs
+
+    def _send(self, status: int, body: Dict[str, Any]) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self) -> None:
+        if self.path == "/hello":
+            self._send(200, {"message": "Hello, world!", "model": self.server.predictor.model_choice})
+        else:
+            self._send(404, {"error": f"unknown endpoint {self.path}"})
+
+    def do_POST(self) -> None:
+        if self.path != "/predict":
+            self._send(404, {"error": f"unknown endpoint {self.path}"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            instances = payload["instances"] if isinstance(payload, dict) else payload
+            t0 = time.perf_counter()
+            scores, flags = self.server.predict(self.server.predictor.matrix(instances))
+            model_ms = (time.perf_counter() - t0) * 1000
+        except (KeyError, TypeError, ValueError) as e:
+            self._send(400, {"error": str(e)})
+            return
+        self._send(200, {
+            "scores": [round(float(s), 6) for s in scores],
+            "anomaly": [bool(f) for f in flags],
+            "threshold": self.server.predictor.threshold,
+            "model_ms": round(model_ms, 3),
+        })
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass  # one line per request on stderr would drown the app's own logs
+
+
+class PredictionServer(ThreadingHTTPServer):
+    """Threaded HTTP server holding one loaded ``Predictor``.
+
+    With a ``batcher``, /predict requests from concurrent connections are
+    scored together instead of one model call per request.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, predictor: Predictor, host: str = "127.0.0.1", port: int = 0, batcher: Optional[MicroBatcher] = None):
+        super().__init__((host, port), _Handler)
+        self.predictor = predictor
+        self.batcher = batcher
+        self.predict = batcher.predict if batcher else predictor.predict
+
+    def server_close(self) -> None:
+        super().server_close()
+        if self.batcher:
+            self.batcher.close()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def start_server(
+    predictor: Predictor,
+    host: str = "127.0.0.1",
+    port: int = 0,
+    batch_items: int = 0,
+    batch_wait_ms: float = 2.0,
+) -> PredictionServer:
+    """Serve ``predictor`` from a daemon thread; ``port=0`` picks a free port.
+
+    ``batch_items > 1`` puts a ``MicroBatcher`` in front of the model.
+    """
+    batcher = MicroBatcher(predictor.predict, batch_items, batch_wait_ms) if batch_items > 1 else None
+    server = PredictionServer(predictor, host, port, batcher)
+    threading.Thread(target=server.serve_forever, name="prediction-server", daemon=True).start()
+    return server
+
+
+def call_endpoint(url: str, payload: Optional[Any] = None, timeout: float = 5.0) -> Tuple[int, Dict[str, Any], float]:
+    """GET ``url`` (or POST ``payload`` as JSON) and return ``(status, body, seconds)``."""
+    data = None if payload is None else json.dumps(payload).encode("utf-8")
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    t0 = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            status, raw = resp.status, resp.read()
+    except urllib.error.HTTPError as e:
+        status, raw = e.code, e.read()
+    return status, json.loads(raw or b"{}"), time.perf_counter() - t0
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--data", help="CSV to fit on (default: the dashboard's sample dataset)")
+    parser.add_argument("--batch-items", type=int, default=64, help="max rows per micro-batch (0 disables)")
+    parser.add_argument("--batch-wait-ms", type=float, default=2.0, help="max time a request waits for a batch")
+    args = parser.parse_args(argv)
+
+    df = pd.read_csv(args.data) if args.data else sample_transactions()
+    predictor = Predictor.fit(df)
+    batcher = MicroBatcher(predictor.predict, args.batch_items, args.batch_wait_ms) if args.batch_items > 1 else None
+    server = PredictionServer(predictor, args.host, args.port, batcher)
+    print(f"Serving /hello and /predict on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()